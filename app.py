@@ -2,10 +2,11 @@
 """
 Memelet Web Interface
 """
-from flask import Flask, render_template, request, jsonify, send_from_directory, redirect, url_for, flash, session
+from flask import Flask, render_template, request, jsonify, send_from_directory, redirect, url_for, flash, session, g, has_app_context, Response
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import check_password_hash, generate_password_hash
-from werkzeug.utils import secure_filename
+from werkzeug.utils import secure_filename, safe_join
+from flask.sessions import SecureCookieSessionInterface
 from uuid import uuid4
 import sqlite3
 import re
@@ -14,15 +15,25 @@ import os
 import hashlib
 import subprocess
 import sys
+import threading
+import time
 import shutil
+import mimetypes
+import itertools
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 from datetime import datetime, timedelta
 from config import (
     get_db_path,
     get_memes_url_base,
     get_memes_dir,
+    get_files_accel_redirect,
     get_log_dir,
     get_script_dir,
     get_venv_dir,
+    get_timezone,
     get_host,
     get_port,
     get_disk_quota_mb,
@@ -32,7 +43,7 @@ from config import (
     get_install_dir,
 )
 import atexit
-from init_database import get_version_from_changelog
+from init_database import get_version_from_changelog, ensure_search_index, ensure_browse_indexes, ensure_job_table
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', os.urandom(24))
@@ -52,7 +63,7 @@ app.permanent_session_lifetime = timedelta(days=14)
 # Mobile browsers (especially Safari on iOS) require explicit cookie attributes
 app.config['SESSION_COOKIE_HTTPONLY'] = True  # Prevent JavaScript access (security)
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # CSRF protection while allowing cross-site navigation
-# SESSION_COOKIE_SECURE will be set dynamically based on request context
+# The Secure flag is decided per request (see RequestAwareSessionInterface)
 # This allows it to work in both HTTP (dev) and HTTPS (prod) environments
 
 # Automatic hourly scanning scheduler (only in standalone mode, not multi-tenant)
@@ -70,35 +81,8 @@ if 'INSTANCE_NAME' not in app.config:
         def run_hourly_scan():
             """Trigger hourly scan in standalone mode"""
             try:
-                script_dir = get_script_dir()
-                log_dir = get_log_dir()
-                shell_script = os.path.join(script_dir, 'run_scan.sh')
-                
-                if os.path.exists(shell_script):
-                    env = os.environ.copy()
-                    env['SCRIPT_DIR'] = script_dir
-                    env['LOG_DIR'] = log_dir
-                    env['DB_PATH'] = get_db_path()
-                    env['MEMES_DIR'] = get_memes_dir()
-                    env['MEMES_URL_BASE'] = get_memes_url_base()
-                    env['VENV_DIR'] = get_venv_dir()
-                    # Ensure PATH includes standard locations for bash
-                    env['PATH'] = '/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin'
-                    
-                    # Use full path to bash to avoid PATH issues in systemd
-                    bash_path = '/bin/bash'
-                    if not os.path.exists(bash_path):
-                        bash_path = '/usr/bin/bash'
-                    
-                    # Execute with bash explicitly to ensure it runs
-                    subprocess.Popen(
-                        [bash_path, shell_script],
-                        stdout=subprocess.DEVNULL,
-                        stderr=open(os.path.join(log_dir, 'scan_errors.log'), 'a'),
-                        env=env,
-                        start_new_session=True
-                    )
-                    app.logger.info("Hourly scan triggered")
+                start_scan()
+                app.logger.info("Hourly scan triggered")
             except Exception as e:
                 app.logger.error(f"Failed to trigger hourly scan: {e}")
         
@@ -136,7 +120,6 @@ def load_user(user_id):
     cursor = conn.cursor()
     cursor.execute("SELECT id, username FROM users WHERE id = ?", (user_id,))
     row = cursor.fetchone()
-    conn.close()
     if row:
         return User(row['id'], row['username'])
     return None
@@ -190,33 +173,11 @@ def inject_api_key_status():
     # Application-stored key (set via Settings -> Replicate API Key)
     has_db_key = False
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Ensure settings table exists (in case context processor runs before API endpoints)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        """)
-        
-        # Ensure version settings exist (for existing databases)
-        _ensure_version_settings(cursor)
-        
-        cursor.execute("SELECT value FROM settings WHERE key = 'replicate_api_key'")
-        row = cursor.fetchone()
-        if row and row[0] and row[0].strip():
-            has_db_key = True
-        conn.commit()
-        conn.close()
+        api_key = get_cached_setting('replicate_api_key')
+        has_db_key = bool(api_key and api_key.strip())
     except Exception:
         # If settings table is missing or inaccessible, treat as no DB key
         has_db_key = False
-        try:
-            conn.close()
-        except Exception:
-            pass
 
     # We only consider the key "externally configured" when either:
     #   - a real env key exists (standalone / direct), or
@@ -250,6 +211,89 @@ def ensure_directories_exist():
     albums_dir.mkdir(parents=True, exist_ok=True)
     return files_dir, albums_dir
 
+# Line framing each entry in scan.log; the settings page splits the log on it
+SCAN_LOG_SEPARATOR = "================================"
+SCAN_LOG_SEPARATOR_LINE = (SCAN_LOG_SEPARATOR + "\n").encode()
+# Only this much of the end of scan.log is read to find the latest entry
+SCAN_LOG_TAIL_BYTES = 65536
+
+# Log directories already created by this process. Keyed by path rather than
+# cached as one constant because LOG_DIR differs per multi-tenant instance.
+_created_log_dirs = set()
+
+# Background jobs are forked from this small pool, so the request (or scheduler
+# tick) that starts one returns without waiting on opening logs and fork/exec
+_launcher = ThreadPoolExecutor(max_workers=4)
+
+def _launch_background(args, log_path, header=b'', capture_stdout=True, **popen_kwargs):
+    """Start args detached from the launcher pool, appending its output to log_path.
+
+    Everything that depends on app config (paths, env) must already be resolved
+    by the caller. Launch failures are logged, since the caller has moved on.
+    """
+    def launch():
+        try:
+            with open(log_path, 'ab') as lf:
+                if header:
+                    lf.write(header)
+                    lf.flush()
+                subprocess.Popen(
+                    args,
+                    stdout=lf if capture_stdout else subprocess.DEVNULL,
+                    stderr=lf,
+                    start_new_session=True,
+                    **popen_kwargs
+                )
+        except Exception as e:
+            app.logger.error(f"Failed to launch {' '.join(args)}: {e}")
+    _launcher.submit(launch)
+
+def start_scan():
+    """Start a background scan + process run, the same work run_scan.sh does.
+
+    process_memes.py is launched directly with the venv interpreter instead of
+    through bash; it takes run_scan.sh's lock file itself (--lock-file), so the
+    two never run at the same time. Output goes to scan.log.
+    """
+    instance_dir = get_script_dir()  # Instance directory (for files, logs, etc.)
+    script_dir = app.config.get('HELPER_SCRIPTS_DIR', instance_dir)
+    venv_dir = get_venv_dir()
+    venv_python = os.path.join(venv_dir, "bin", "python")
+    python_exec = venv_python if os.path.exists(venv_python) else "python3"
+    lock_file = os.environ.get('LOCK_FILE') or os.path.join(script_dir, 'scan.lock')
+    
+    env = os.environ.copy()
+    env['SCRIPT_DIR'] = instance_dir
+    env['LOG_DIR'] = get_log_dir()
+    env['DB_PATH'] = get_db_path()
+    env['MEMES_DIR'] = get_memes_dir()
+    env['MEMES_URL_BASE'] = get_memes_url_base()  # Critical for Replicate API image URLs
+    env['VENV_DIR'] = venv_dir
+    env['TZ'] = get_timezone()
+    # INSTANCE_DIR is required for sitecustomize.py to load in multi-tenant mode
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in (env.get('INSTANCE_DIR'), script_dir, env.get('PYTHONPATH')) if p
+    )
+    
+    _launch_background(
+        [python_exec, os.path.join(script_dir, 'process_memes.py'), '--scan', '--process', '--lock-file', lock_file],
+        get_scan_log_file(),
+        cwd=script_dir,
+        env=env
+    )
+
+def get_log_file(name):
+    """Get path to a file in the log directory, creating the directory once per process"""
+    log_dir = get_log_dir()
+    if log_dir not in _created_log_dirs:
+        os.makedirs(log_dir, exist_ok=True)
+        _created_log_dirs.add(log_dir)
+    return os.path.join(log_dir, name)
+
+def get_scan_log_file():
+    """Get path to scan.log, creating the log directory once per process"""
+    return get_log_file('scan.log')
+
 # File type validation
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
 GIF_EXTENSIONS = {'.gif'}
@@ -271,41 +315,79 @@ MAX_MEME_MEANING_LENGTH = 2000
 MAX_MEME_TEMPLATE_LENGTH = 200
 MAX_MEME_REF_CONTENT_LENGTH = 1000
 
+class RequestAwareSessionInterface(SecureCookieSessionInterface):
+    """Session cookies marked Secure only when the current request arrived over HTTPS"""
+
+    def get_cookie_secure(self, app):
+        # Check if request is secure (either directly or via proxy header)
+        # This allows cookies to work in both HTTP (dev) and HTTPS (prod) environments
+        return (
+            request.is_secure or
+            request.headers.get('X-Forwarded-Proto', '').lower() == 'https' or
+            os.environ.get('HTTPS', '').lower() == 'true'
+        )
+
+# Decided per request without writing SESSION_COOKIE_SECURE into the shared app.config,
+# which raced between concurrent HTTP and HTTPS requests
+app.session_interface = RequestAwareSessionInterface()
+
+# (INSTANCE_NAME, URL root) the APPLICATION_ROOT was last set for. The multi-tenant
+# wrapper fills in INSTANCE_NAME after this module is imported, so the root is
+# worked out on the first request rather than at import.
+_instance_root = (None, None)
+
 @app.before_request
 def set_instance_paths_and_url_root():
     """Set SCRIPT_NAME and APPLICATION_ROOT for URL generation in multi-tenant setup"""
+    global _instance_root
+    # Static assets generate no URLs and need none of this
+    if request.endpoint in ('static', 'favicon'):
+        return
+
     # Set SCRIPT_NAME for URL generation to include the instance prefix
     # This is crucial for url_for to generate correct URLs like /for/username/login
-    if 'INSTANCE_NAME' in app.config:
-        instance_name = app.config['INSTANCE_NAME']
-        request.environ['SCRIPT_NAME'] = f'/for/{instance_name}'
-        app.config['APPLICATION_ROOT'] = f'/for/{instance_name}' # Re-added this for Flask-Login
-
-    # Dynamically set SESSION_COOKIE_SECURE based on request context
-    # Check if request is secure (either directly or via proxy header)
-    # This allows cookies to work in both HTTP (dev) and HTTPS (prod) environments
-    is_secure = (
-        request.is_secure or 
-        request.headers.get('X-Forwarded-Proto', '').lower() == 'https' or
-        os.environ.get('HTTPS', '').lower() == 'true'
-    )
-    app.config['SESSION_COOKIE_SECURE'] = is_secure
+    instance_name = app.config.get('INSTANCE_NAME')
+    if instance_name is not None:
+        if _instance_root[0] != instance_name:
+            # Needed by Flask-Login; set once per instance, not on every request
+            _instance_root = (instance_name, f"/for/{instance_name}")
+            app.config['APPLICATION_ROOT'] = _instance_root[1]
+        request.environ['SCRIPT_NAME'] = _instance_root[1]
+
+    # Log authentication state for debugging (loads the user, so only in debug mode)
+    if app.debug:
+        if current_user.is_authenticated:
+            app.logger.info(f"Auth state: authenticated=True, user_id={current_user.id}")
+        else:
+            app.logger.info(f"Auth state: authenticated=False, user_id=None")
 
-    # Log authentication state for debugging
-    if current_user.is_authenticated:
-        app.logger.info(f"Auth state: authenticated=True, user_id={current_user.id}")
-    else:
-        app.logger.info(f"Auth state: authenticated=False, user_id=None")
+# Browsers request the favicon for every tab; let them keep it for 30 days
+FAVICON_CACHE_MAX_AGE = 30 * 24 * 3600  # seconds
 
 @app.route('/favicon.ico')
 def favicon():
-    return send_from_directory(app.static_folder, 'favicon.ico', mimetype='image/x-icon')
+    return send_from_directory(app.static_folder, 'favicon.ico', mimetype='image/x-icon',
+                               max_age=FAVICON_CACHE_MAX_AGE)
 
 @app.route('/files/<path:filename>')
 def serve_meme_file(filename):
     """Serve meme files from the memes directory"""
     try:
         files_dir = get_files_dir()
+        accel_location = get_files_accel_redirect()
+        if accel_location:
+            # Behind nginx: hand the transfer to an internal location so the
+            # worker thread is not tied up streaming large videos
+            if safe_join(str(files_dir), filename) is None:
+                return "File not found", 404
+            response = Response(
+                mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            )
+            response.headers['X-Accel-Redirect'] = accel_location.rstrip('/') + '/' + quote(filename)
+            # File names (and thumbnail names) are reused after a delete or
+            # regeneration, so clients must always revalidate
+            response.cache_control.no_cache = True
+            return response
         return send_from_directory(files_dir, filename)
     except FileNotFoundError:
         return "File not found", 404
@@ -362,7 +444,6 @@ def login():
         cursor = conn.cursor()
         cursor.execute("SELECT id, username, password_hash FROM users WHERE username = ?", (username,))
         row = cursor.fetchone()
-        conn.close()
         
         if row and check_password_hash(row['password_hash'], password):
             user = User(row['id'], row['username'])
@@ -399,17 +480,286 @@ def logout():
     # In private mode, redirect to login page
     return redirect(url_for('login'))
 
+# Per-connection tuning: temp b-trees (sorts, GROUP BY) stay in RAM, reads go
+# through a 256MB memory map, and the page cache is raised to 64MB (negative = KiB).
+# In WAL mode synchronous=NORMAL is still crash-safe; busy_timeout makes a request
+# wait for a concurrent writer (e.g. the scan) instead of failing with "database is locked".
+DB_CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# Prepared statements kept per connection. Pooled connections live across many
+# requests, and the routes plus the gallery filter variants exceed the default 128.
+DB_STATEMENT_CACHE_SIZE = 256
+
+# Database files whose runtime schema upkeep already ran in this process
+# (keyed by path: each multi-tenant instance has its own database)
+_prepared_databases = set()
+_prepare_lock = threading.Lock()
+
+def _prepare_database(conn, db_path):
+    """Bring a database up to the schema this app expects, once per process"""
+    with _prepare_lock:
+        if db_path in _prepared_databases:
+            return
+        cursor = conn.cursor()
+        try:
+            # WAL lets page renders read while process_memes.py is writing; the mode
+            # is stored in the database file, so this only has to happen once
+            cursor.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error as e:
+            app.logger.error(f"Could not enable WAL mode for {db_path}: {e}")
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+            # Ensure version settings and UI defaults exist (for existing databases)
+            _ensure_version_settings(cursor)
+            cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('agent_form', 'none')")
+            cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('replicate_api_key', '')")
+            conn.commit()
+        except sqlite3.Error as e:
+            app.logger.error(f"Could not prepare settings table in {db_path}: {e}")
+        try:
+            # Databases created before full-text search was added get it here
+            ensure_search_index(cursor)
+            conn.commit()
+        except sqlite3.Error as e:
+            app.logger.error(f"Could not create search index in {db_path}: {e}")
+        try:
+            ensure_browse_indexes(cursor)
+            conn.commit()
+        except sqlite3.Error as e:
+            app.logger.error(f"Could not create indexes in {db_path}: {e}")
+        try:
+            ensure_job_table(cursor)
+            conn.commit()
+        except sqlite3.Error as e:
+            app.logger.error(f"Could not create scan_jobs table in {db_path}: {e}")
+        _prepared_databases.add(db_path)
+
+# Settings read on nearly every request (privacy mode, Clippy agent, stored API key)
+# are cached briefly instead of queried each time. Keyed by database path for
+# multi-tenant deployments; the settings endpoints invalidate entries they write.
+SETTINGS_CACHE_TTL = 30  # seconds
+_settings_cache = {}
+
+def get_cached_setting(key):
+    """Get a value from the settings table, cached for SETTINGS_CACHE_TTL seconds"""
+    cache_key = (get_db_path(), key)
+    cached = _settings_cache.get(cache_key)
+    if cached is not None and time.monotonic() - cached[1] < SETTINGS_CACHE_TTL:
+        return cached[0]
+
+    conn = get_db_connection()
+    row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    value = row[0] if row else None
+    _settings_cache[cache_key] = (value, time.monotonic())
+    return value
+
+def invalidate_cached_setting(key):
+    """Drop a cached setting after it has been changed"""
+    _settings_cache.pop((get_db_path(), key), None)
+
+# Request connections are returned to a small per-database pool on teardown
+# rather than closed, so most requests skip the connect and PRAGMA setup.
+# A pooled connection is only ever used by one thread at a time.
+DB_POOL_MAX_IDLE = 10  # idle connections kept per database
+_idle_db_connections = {}  # db_path -> [connection, ...]
+_idle_db_connections_lock = threading.Lock()
+# Pooled connections rarely close, so PRAGMA optimize (normally run at close)
+# is run on release instead, at most this often per database
+DB_OPTIMIZE_INTERVAL = 3600  # seconds
+_db_last_optimized = {}  # db_path -> time.monotonic() of the last PRAGMA optimize
+
+def _open_db_connection(db_path):
+    """Open and configure a new connection to db_path"""
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=DB_STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    for pragma in DB_CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if db_path not in _prepared_databases:
+        _prepare_database(conn, db_path)
+    return conn
+
 def get_db_connection():
-    """Get database connection with dynamic path for multi-tenant support"""
+    """Get database connection with dynamic path for multi-tenant support
+
+    Inside a request (or any app context) one connection is shared by every
+    caller and closed on teardown, so handlers must not close it themselves.
+    Outside an app context a new connection is returned and the caller owns it.
+    """
     db_path = get_db_path()  # Get path fresh each time
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    if not has_app_context():
+        return _open_db_connection(db_path)
+    if g.get('db_path') != db_path:
+        _close_db_connection()
+        g.db = _acquire_db_connection(db_path)
+        g.db_path = db_path
+    return g.db
+
+def _acquire_db_connection(db_path):
+    """Take an idle pooled connection to db_path, or open a new one"""
+    with _idle_db_connections_lock:
+        idle = _idle_db_connections.get(db_path)
+        if idle:
+            return idle.pop()
+    return _open_db_connection(db_path)
+
+def _release_db_connection(db_path, conn):
+    """Return a connection to the pool, or close it if the pool is full or it is unusable"""
+    try:
+        if conn.in_transaction:
+            # Never hand a half-done transaction to the next request
+            conn.rollback()
+        now = time.monotonic()
+        with _idle_db_connections_lock:
+            optimize = now - _db_last_optimized.setdefault(db_path, now) >= DB_OPTIMIZE_INTERVAL
+            if optimize:
+                _db_last_optimized[db_path] = now
+        if optimize:
+            conn.execute("PRAGMA optimize")
+        with _idle_db_connections_lock:
+            idle = _idle_db_connections.setdefault(db_path, [])
+            if len(idle) < DB_POOL_MAX_IDLE:
+                idle.append(conn)
+                return
+    except sqlite3.Error:
+        pass
+    conn.close()
 
-    # Register a custom Unicode-aware LOWER function for case-insensitive search
-    # This replaces SQLite's default LOWER which only works for ASCII
-    conn.create_function("LOWER", 1, lambda s: s.lower() if s else s)
+@app.teardown_appcontext
+def _close_db_connection(exc=None):
+    """Release the connection used by this app context, if any"""
+    db_path = g.pop('db_path', None)
+    conn = g.pop('db', None)
+    if conn is not None:
+        _release_db_connection(db_path, conn)
 
-    return conn
+def build_search_match(search_query):
+    """Translate search box text into an FTS5 MATCH expression for memes_fts.
+
+    Words become prefix terms ("cat" finds "cats"), text in "double quotes" must
+    appear as a phrase, and every term is required. Returns None if nothing
+    searchable is left.
+    """
+    phrases = re.findall(r'"([^"]+)"', search_query)
+    # Remove quoted phrases from the string, then split remaining text into words
+    remaining = re.sub(r'"[^"]+"', " ", search_query)
+    words = [w for w in remaining.split() if w]
+
+    # Terms without any word characters tokenize to nothing and would match nothing
+    terms = [f'"{p}"' for p in phrases if re.search(r'\w', p)]
+    terms += ['"{}"*'.format(w.replace('"', '""')) for w in words if re.search(r'\w', w)]
+    return ' '.join(terms) or None
+
+# Filter fragment restricting memes to full-text search hits
+SEARCH_FILTER_SQL = " AND m.id IN (SELECT rowid FROM memes_fts WHERE memes_fts MATCH ?)"
+
+# Gallery filter fragments: status, tag, media type, search (parameters bound in this order)
+GALLERY_FILTER_SQL = (
+    " AND m.status = ?",
+    """ AND m.id IN (
+            SELECT meme_id FROM meme_tags WHERE tag_id = ?
+        )""",
+    " AND m.media_type = ?",
+    SEARCH_FILTER_SQL,
+)
+
+@functools.lru_cache(maxsize=None)
+def _gallery_where(flags):
+    """WHERE fragment for the gallery filters that are switched on in flags"""
+    return ''.join(fragment for fragment, active in zip(GALLERY_FILTER_SQL, flags) if active)
+
+def _build_filter_clauses(status_filter, tag_filter, media_filter, search_match):
+    """Return the WHERE fragment and its parameters for the active gallery filters.
+
+    Shared by the index page and the detail page navigation so both walk the
+    same list. search_match is the MATCH expression from build_search_match().
+    """
+    values = (status_filter, tag_filter, media_filter, search_match)
+    return _gallery_where(tuple(bool(value) for value in values)), [value for value in values if value]
+
+# Page and count queries for each of the 16 filter combinations, built once so
+# requests with the same active filters send SQLite byte-identical statements
+# (served from the connection's statement cache after the first execution).
+# The total number of matches comes back on every row via a window function,
+# so the page and the pagination count are a single query.
+INDEX_PAGE_SQL = {
+    _gallery_where(flags): f"""
+        SELECT m.id, m.file_path, m.title, m.status, m.media_type, m.ref_content, m.template, 
+               m.caption, m.description, m.meaning, m.error_message, m.created_at,
+               COUNT(*) OVER () AS total_count
+        FROM memes m
+        WHERE 1=1{_gallery_where(flags)}
+        ORDER BY m.created_at DESC, m.id
+        LIMIT ? OFFSET ?
+    """
+    for flags in itertools.product((False, True), repeat=len(GALLERY_FILTER_SQL))
+}
+INDEX_COUNT_SQL = {
+    where: f"SELECT COUNT(*) FROM memes m WHERE 1=1{where}"
+    for where in INDEX_PAGE_SQL
+}
+
+# Detail page prev/next: the gallery is ordered by created_at DESC, id, so seek
+# to the neighbours on either side of a meme instead of loading the whole list
+NAV_PREV_SQL = {
+    where: f"""
+        SELECT m.id FROM memes m
+        WHERE 1=1{where}
+          AND m.created_at >= ? AND NOT (m.created_at = ? AND m.id >= ?)
+        ORDER BY m.created_at, m.id DESC
+        LIMIT 1
+    """
+    for where in INDEX_PAGE_SQL
+}
+NAV_NEXT_SQL = {
+    where: f"""
+        SELECT m.id FROM memes m
+        WHERE 1=1{where}
+          AND m.created_at <= ? AND NOT (m.created_at = ? AND m.id <= ?)
+        ORDER BY m.created_at DESC, m.id
+        LIMIT 1
+    """
+    for where in INDEX_PAGE_SQL
+}
+
+# One requests session for outbound calls (GitHub, the managing service), so
+# repeated calls to the same host reuse the TCP/TLS connection
+_http_session = None
+
+def get_http_session():
+    """Get the shared requests session"""
+    global _http_session
+    if _http_session is None:
+        import requests
+        _http_session = requests.Session()
+    return _http_session
+
+# Parsed config.json per path, reused until the file's mtime changes
+_instance_config_cache = {}
+
+def read_instance_config():
+    """Get the instance's config.json (written by the multi-tenant wrapper) as a dict, or None if absent"""
+    config_path = os.path.join(get_instance_path(), 'config.json')
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _instance_config_cache.get(config_path)
+    if cached is None or cached[0] != mtime:
+        with open(config_path, 'r') as f:
+            cached = (mtime, json.load(f))
+        _instance_config_cache[config_path] = cached
+    return cached[1]
 
 # Version management helper functions
 def get_current_version():
@@ -417,19 +767,8 @@ def get_current_version():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        # Ensure settings table and version settings exist
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        """)
-        _ensure_version_settings(cursor)
-        conn.commit()
-        
         cursor.execute("SELECT value FROM settings WHERE key = 'current_version'")
         row = cursor.fetchone()
-        conn.close()
         return row[0] if row and row[0] else None
     except Exception:
         return None
@@ -439,19 +778,8 @@ def get_current_branch():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        # Ensure settings table and version settings exist
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        """)
-        _ensure_version_settings(cursor)
-        conn.commit()
-        
         cursor.execute("SELECT value FROM settings WHERE key = 'current_branch'")
         row = cursor.fetchone()
-        conn.close()
         return row[0] if row and row[0] else 'main'
     except Exception:
         return 'main'
@@ -466,7 +794,6 @@ def set_current_version(version):
             (version,)
         )
         conn.commit()
-        conn.close()
         return True
     except Exception as e:
         app.logger.error(f"Error setting current_version: {e}")
@@ -482,7 +809,6 @@ def set_current_branch(branch):
             (branch,)
         )
         conn.commit()
-        conn.close()
         return True
     except Exception as e:
         app.logger.error(f"Error setting current_branch: {e}")
@@ -492,7 +818,6 @@ def set_last_update_check(timestamp=None):
     """Update last_update_check in settings table. Returns True if successful."""
     try:
         if timestamp is None:
-            from datetime import datetime
             timestamp = datetime.now().isoformat()
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -501,7 +826,6 @@ def set_last_update_check(timestamp=None):
             (timestamp,)
         )
         conn.commit()
-        conn.close()
         return True
     except Exception as e:
         app.logger.error(f"Error setting last_update_check: {e}")
@@ -514,7 +838,6 @@ def validate_version_format(version):
     """
     if not version:
         return False
-    import re
     pattern = r'^\d+\.\d+\.\d+$'
     return bool(re.match(pattern, version))
 
@@ -606,15 +929,11 @@ def get_available_version():
     if 'INSTANCE_NAME' in app.config:
         # Multi-tenant: read from config.json first (like git_branch), then env var
         try:
-            instance_path = Path(get_instance_path())
-            config_file = instance_path / 'config.json'
-            if config_file.exists():
-                import json
-                with open(config_file, 'r') as f:
-                    instance_config = json.load(f)
-                    available_version = instance_config.get('available_version')
-                    if available_version and validate_version_format(available_version):
-                        return available_version
+            instance_config = read_instance_config()
+            if instance_config:
+                available_version = instance_config.get('available_version')
+                if available_version and validate_version_format(available_version):
+                    return available_version
         except Exception as e:
             app.logger.warning(f"Could not read available_version from config.json: {e}")
         
@@ -647,7 +966,7 @@ def get_available_version():
             
             # Get all tags and filter by branch
             tags_url = f'https://api.github.com/repos/{github_repo}/tags'
-            tags_response = requests.get(tags_url, timeout=5)
+            tags_response = get_http_session().get(tags_url, timeout=5)
             if tags_response.status_code == 200:
                 tags = tags_response.json()
                 if tags:
@@ -681,7 +1000,7 @@ def get_available_version():
             
             # Also try releases endpoint (but releases are global, not branch-specific)
             api_url = f'https://api.github.com/repos/{github_repo}/releases/latest'
-            response = requests.get(api_url, timeout=5)
+            response = get_http_session().get(api_url, timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 tag_name = data.get('tag_name', '').lstrip('v')
@@ -868,7 +1187,6 @@ def perform_update(target_version, branch=None, install_dir=None, github_repo=No
                     }
                 
                 # Update version from CHANGELOG.md if available
-                from init_database import get_version_from_changelog
                 new_version = get_version_from_changelog()
                 if new_version:
                     set_current_version(new_version)
@@ -956,7 +1274,7 @@ def perform_update(target_version, branch=None, install_dir=None, github_repo=No
             backup_dir.mkdir(parents=True, exist_ok=True)
             
             # Files/directories to preserve (user data)
-            preserve = ['files', 'logs', 'memelet.db', 'venv', '.env', 'config.json', '.git']
+            preserve = ['files', 'logs', 'memelet.db', 'memelet.db-wal', 'memelet.db-shm', 'venv', '.env', 'config.json', '.git']
             
             # Copy files to backup (excluding preserved items)
             for item in install_dir.iterdir():
@@ -1013,20 +1331,13 @@ def perform_update(target_version, branch=None, install_dir=None, github_repo=No
 def is_public_mode():
     """Check if site is in public mode"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM settings WHERE key = 'privacy_mode'")
-        row = cursor.fetchone()
-        conn.close()
-        return row and row['value'] == 'public'
+        return get_cached_setting('privacy_mode') == 'public'
     except Exception:
         return False
 
 def login_required_unless_public(f):
     """Decorator that requires login only if not in public mode"""
-    from functools import wraps
-    
-    @wraps(f)
+    @functools.wraps(f)
     def decorated_function(*args, **kwargs):
         if not is_public_mode() and not current_user.is_authenticated:
             return login_manager.unauthorized()
@@ -1036,29 +1347,44 @@ def login_required_unless_public(f):
 def get_clippy_agent():
     """Get current Clippy agent selection from settings"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        # Ensure settings table exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        """)
-        # Ensure default value exists
-        cursor.execute("SELECT value FROM settings WHERE key = 'agent_form'")
-        row = cursor.fetchone()
-        if not row:
-            cursor.execute("INSERT INTO settings (key, value) VALUES ('agent_form', 'none')")
-            conn.commit()
-            agent_form = 'none'
-        else:
-            agent_form = row[0]
-        conn.close()
-        return agent_form
+        return get_cached_setting('agent_form') or 'none'
     except Exception:
         return 'none'
 
+def build_urls(file_paths, media_types, memes_dir, url_base):
+    """Build (image_url, video_url) pairs for gallery cards.
+
+    Paths are made relative to memes_dir with a plain prefix check, which is
+    equivalent to Path.relative_to() for the normalized absolute paths stored
+    in the database but avoids creating Path objects for every meme.
+    """
+    prefix = os.path.join(os.path.normpath(str(memes_dir)), '')
+    urls = []
+    for file_path, media_type in zip(file_paths, media_types):
+        file_name = os.path.basename(file_path)
+        if file_path.startswith(prefix):
+            relative_path = file_path[len(prefix):].replace(os.sep, '/')
+        else:
+            relative_path = None
+        
+        if media_type == 'video':
+            # For videos, use preview GIF from thumbnails directory in _system
+            video_stem = os.path.splitext(file_name)[0]
+            if relative_path is not None:
+                parent_relative = relative_path.rpartition('/')[0]
+                thumbnail_dir = f"_system/thumbnails/{parent_relative}/" if parent_relative else "_system/thumbnails/"
+                urls.append((url_base + f"{thumbnail_dir}{video_stem}_preview.gif", url_base + relative_path))
+            else:
+                # Fallback if path isn't relative to memes_dir
+                urls.append((url_base + f"_system/thumbnails/{video_stem}_preview.gif", url_base + file_name))
+        elif media_type == 'gif':
+            # Use the actual GIF (it will animate)
+            url = url_base + (relative_path if relative_path is not None else file_name)
+            urls.append((url, url))
+        else:
+            urls.append((url_base + (relative_path if relative_path is not None else file_name), None))
+    return urls
+
 @app.route('/')
 @login_required_unless_public
 def index():
@@ -1074,186 +1400,81 @@ def index():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Build the SQL query based on filters
-    sql = """
-        SELECT DISTINCT m.id, m.file_path, m.title, m.status, m.media_type, m.ref_content, m.template, 
-               m.caption, m.description, m.meaning, m.error_message, m.created_at
-        FROM memes m
-        WHERE 1=1
-    """
-    params = []
-    
-    # Add status filter
-    if status_filter:
-        sql += " AND m.status = ?"
-        params.append(status_filter)
-    
-    # Add tag filter
-    if tag_filter:
-        sql += """ AND m.id IN (
-            SELECT meme_id FROM meme_tags WHERE tag_id = ?
-        )"""
-        params.append(tag_filter)
-    
-    # Add media type filter
-    if media_filter:
-        sql += " AND m.media_type = ?"
-        params.append(media_filter)
-    
-    # Add search filter (search in all text fields, title and file path)
-    # Use custom LOWER function for Unicode-aware case-insensitive search
-    # Support:
-    #   - word-based search: all words must appear (in any order)
-    #   - phrase search: anything in "double quotes" must appear as a substring
-    if search_query:
-        # Extract quoted phrases: "exact phrase"
-        phrases = re.findall(r'"([^"]+)"', search_query)
-        # Remove quoted phrases from the string, then split remaining text into words
-        remaining = re.sub(r'"[^"]+"', " ", search_query)
-        words = [w for w in remaining.split() if w]
-
-        # Terms to require, all combined with AND
-        # Each term is (type, text) where type is 'phrase' or 'word'
-        terms = [('phrase', p) for p in phrases] + [('word', w) for w in words]
-
-        if terms:
-            for term_type, text in terms:
-                sql += """ AND (
-                    LOWER(m.file_path) LIKE LOWER(?) OR
-                    LOWER(m.title) LIKE LOWER(?) OR
-                    LOWER(m.ref_content) LIKE LOWER(?) OR
-                    LOWER(m.template) LIKE LOWER(?) OR
-                    LOWER(m.caption) LIKE LOWER(?) OR
-                    LOWER(m.description) LIKE LOWER(?) OR
-                    LOWER(m.meaning) LIKE LOWER(?)
-                )"""
-                pattern = f"%{text}%"
-                params.extend([pattern] * 7)
-    
-    sql += " ORDER BY m.created_at DESC"
-    
-    # Get total count for pagination - use a separate count query
-    count_sql = """
-        SELECT COUNT(DISTINCT m.id)
-        FROM memes m
-        WHERE 1=1
-    """
-    count_params = []
-    
-    # Add status filter to count query
-    if status_filter:
-        count_sql += " AND m.status = ?"
-        count_params.append(status_filter)
-    
-    # Add tag filter to count query
-    if tag_filter:
-        count_sql += """ AND m.id IN (
-            SELECT meme_id FROM meme_tags WHERE tag_id = ?
-        )"""
-        count_params.append(tag_filter)
+    # Search is full-text over all text fields, title and file path. Support:
+    #   - word-based search: all words must appear (in any order), matched as word prefixes
+    #   - phrase search: anything in "double quotes" must appear as a phrase
+    search_match = build_search_match(search_query) if search_query else None
     
-    # Add media type filter to count query
-    if media_filter:
-        count_sql += " AND m.media_type = ?"
-        count_params.append(media_filter)
+    # Pick the prebuilt query for the active filters and bind their values
+    where_sql, params = _build_filter_clauses(status_filter, tag_filter, media_filter, search_match)
     
-    # Add search filter to count query (must mirror the main query)
-    if search_query:
-        phrases = re.findall(r'"([^"]+)"', search_query)
-        remaining = re.sub(r'"[^"]+"', " ", search_query)
-        words = [w for w in remaining.split() if w]
-        terms = [('phrase', p) for p in phrases] + [('word', w) for w in words]
-
-        if terms:
-            for term_type, text in terms:
-                count_sql += """ AND (
-                    LOWER(m.file_path) LIKE LOWER(?) OR
-                    LOWER(m.title) LIKE LOWER(?) OR
-                    LOWER(m.ref_content) LIKE LOWER(?) OR
-                    LOWER(m.template) LIKE LOWER(?) OR
-                    LOWER(m.caption) LIKE LOWER(?) OR
-                    LOWER(m.description) LIKE LOWER(?) OR
-                    LOWER(m.meaning) LIKE LOWER(?)
-                )"""
-                pattern = f"%{text}%"
-                count_params.extend([pattern] * 7)
-    
-    cursor.execute(count_sql, count_params)
-    total_memes = cursor.fetchone()[0]
+    offset = (page - 1) * per_page
+    cursor.execute(INDEX_PAGE_SQL[where_sql], params + [per_page, offset])
+    rows = cursor.fetchall()
+    
+    if rows:
+        total_memes = rows[0]['total_count']
+    elif page > 1:
+        # Past the last page there are no rows to carry the total
+        cursor.execute(INDEX_COUNT_SQL[where_sql], params)
+        total_memes = cursor.fetchone()[0]
+    else:
+        total_memes = 0
     
     # Calculate pagination
     total_pages = (total_memes + per_page - 1) // per_page
-    offset = (page - 1) * per_page
-    sql += f" LIMIT {per_page} OFFSET {offset}"
     
-    cursor.execute(sql, params)
+    # Fetch tags and album previews for the whole page at once rather than per meme
+    tags_by_id = {}
+    previews_by_id = {}
+    if rows:
+        page_ids = [row['id'] for row in rows]
+        placeholders = ','.join('?' * len(page_ids))
+        cursor.execute(f"""
+            SELECT mt.meme_id, t.id, t.name, t.color
+            FROM meme_tags mt
+            JOIN tags t ON t.id = mt.tag_id
+            WHERE mt.meme_id IN ({placeholders})
+            ORDER BY mt.meme_id, t.name
+        """, page_ids)
+        for t in cursor.fetchall():
+            tags_by_id.setdefault(t['meme_id'], []).append(
+                {'id': t['id'], 'name': t['name'], 'color': t['color']}
+            )
+        
+        album_ids = [row['id'] for row in rows if row['media_type'] == 'album']
+        if album_ids:
+            placeholders = ','.join('?' * len(album_ids))
+            cursor.execute(f"""
+                SELECT album_id, file_path FROM album_items
+                WHERE album_id IN ({placeholders})
+                ORDER BY album_id, display_order
+            """, album_ids)
+            for item in cursor.fetchall():
+                # Only the first 3 items are shown as previews
+                item_paths = previews_by_id.setdefault(item['album_id'], [])
+                if len(item_paths) < 3:
+                    item_paths.append(item['file_path'])
+    
+    # Resolved once for the whole page rather than per meme
+    memes_dir = get_memes_dir()
+    url_base = get_memes_url_base_dynamic()
+    
+    album_previews_by_id = {
+        album_id: [image_url for image_url, _ in build_urls(paths, ['image'] * len(paths), memes_dir, url_base)]
+        for album_id, paths in previews_by_id.items()
+    }
+    
+    card_urls = build_urls(
+        [row['file_path'] for row in rows], [row['media_type'] for row in rows], memes_dir, url_base
+    )
     
     memes = []
-    for row in cursor.fetchall():
-        file_name = Path(row['file_path']).name
+    for row, (image_url, video_url) in zip(rows, card_urls):
         meme_id = row['id']
         media_type = row['media_type']
-        file_path_obj = Path(row['file_path'])
-        memes_dir = get_memes_dir()
-        
-        # Calculate relative path for proper URLs
-        try:
-            relative_path = file_path_obj.relative_to(Path(memes_dir))
-            relative_path_str = relative_path.as_posix()
-        except ValueError:
-            relative_path_str = file_name
-        
-        # For videos, use preview GIF from thumbnails directory in _system
-        if media_type == 'video':
-            video_stem = Path(file_name).stem
-            try:
-                # Build thumbnail path in _system/thumbnails
-                parent_relative = file_path_obj.parent.relative_to(Path(memes_dir))
-                thumbnail_relative = Path('_system') / 'thumbnails' / parent_relative / f"{video_stem}_preview.gif"
-                image_url = get_memes_url_base_dynamic() + thumbnail_relative.as_posix()
-            except ValueError:
-                # Fallback if path isn't relative to memes_dir
-                image_url = get_memes_url_base_dynamic() + f"_system/thumbnails/{video_stem}_preview.gif"
-            video_url = get_memes_url_base_dynamic() + relative_path_str
-        elif media_type == 'gif':
-            # Use the actual GIF (it will animate)
-            image_url = get_memes_url_base_dynamic() + relative_path_str
-            video_url = get_memes_url_base_dynamic() + relative_path_str
-        else:
-            image_url = get_memes_url_base_dynamic() + relative_path_str
-            video_url = None
-        
-        album_previews = []
-        if media_type == 'album':
-            # Fetch up to 3 preview items for the album
-            cursor.execute(
-                """
-                SELECT file_path FROM album_items
-                WHERE album_id = ?
-                ORDER BY display_order
-                LIMIT 3
-                """,
-                (meme_id,)
-            )
-            item_paths = [r['file_path'] for r in cursor.fetchall()]
-            for p in item_paths:
-                p_obj = Path(p)
-                try:
-                    rel = p_obj.relative_to(Path(memes_dir))
-                    album_previews.append(get_memes_url_base_dynamic() + rel.as_posix())
-                except ValueError:
-                    album_previews.append(get_memes_url_base_dynamic() + p_obj.name)
-
-        # Get tags for this meme
-        cursor.execute("""
-            SELECT t.id, t.name, t.color
-            FROM tags t
-            JOIN meme_tags mt ON t.id = mt.tag_id
-            WHERE mt.meme_id = ?
-            ORDER BY t.name
-        """, (meme_id,))
-        
-        tags = [{'id': t['id'], 'name': t['name'], 'color': t['color']} for t in cursor.fetchall()]
+        album_previews = album_previews_by_id.get(meme_id, [])
+        tags = tags_by_id.get(meme_id, [])
         
         memes.append({
             'id': row['id'],
@@ -1269,14 +1490,15 @@ def index():
         })
     
     # Get stats (always show all stats, regardless of filters)
-    cursor.execute("SELECT status, COUNT(*) as count FROM memes GROUP BY status")
-    stats = {row['status']: row['count'] for row in cursor.fetchall()}
-    cursor.execute("SELECT COUNT(*) as total FROM memes")
-    total = cursor.fetchone()['total']
-    
-    # Get media type stats
-    cursor.execute("SELECT media_type, COUNT(*) as count FROM memes GROUP BY media_type")
-    media_stats = {row['media_type']: row['count'] for row in cursor.fetchall()}
+    # Status, media type and overall totals all come from one grouped scan
+    cursor.execute("SELECT status, media_type, COUNT(*) as count FROM memes GROUP BY status, media_type")
+    stats = {}
+    media_stats = {}
+    total = 0
+    for row in cursor.fetchall():
+        stats[row['status']] = stats.get(row['status'], 0) + row['count']
+        media_stats[row['media_type']] = media_stats.get(row['media_type'], 0) + row['count']
+        total += row['count']
     
     # Get all tags with usage count (including tags with 0 usage)
     cursor.execute("""
@@ -1288,8 +1510,6 @@ def index():
     """)
     all_tags = [{'id': r['id'], 'name': r['name'], 'color': r['color'], 'count': r['usage_count']} for r in cursor.fetchall()]
     
-    conn.close()
-    
     # Get base URL for API calls (for multi-tenant support)
     base_url = request.environ.get('SCRIPT_NAME', '')
     
@@ -1334,7 +1554,6 @@ def meme_detail(meme_id):
     if request.method == 'POST':
         # Require authentication for editing
         if not current_user.is_authenticated:
-            conn.close()
             return redirect(url_for('login'))
         
         # Update meme details
@@ -1362,7 +1581,6 @@ def meme_detail(meme_id):
             errors.append(f'References too long (max {MAX_MEME_REF_CONTENT_LENGTH} characters)')
         
         if errors:
-            conn.close()
             flash('; '.join(errors), 'error')
             return redirect(url_for('meme_detail', meme_id=meme_id))
         
@@ -1380,24 +1598,23 @@ def meme_detail(meme_id):
         """, (status, title or None, ref_content or None, template or None, caption or None, 
               description or None, meaning or None, meme_id))
         
-        # Update tags
-        selected_tags = request.form.getlist('tags')
-        
-        # Remove all existing tags
-        cursor.execute("DELETE FROM meme_tags WHERE meme_id = ?", (meme_id,))
+        # Update tags: only delete/insert the ones that changed
+        selected_tags = {int(tag_id) for tag_id in request.form.getlist('tags')}
+        cursor.execute("SELECT tag_id FROM meme_tags WHERE meme_id = ?", (meme_id,))
+        existing_tags = {r['tag_id'] for r in cursor.fetchall()}
         
-        # Add selected tags
-        for tag_id in selected_tags:
-            cursor.execute("""
-                INSERT INTO meme_tags (meme_id, tag_id)
-                VALUES (?, ?)
-            """, (meme_id, int(tag_id)))
+        cursor.executemany(
+            "DELETE FROM meme_tags WHERE meme_id = ? AND tag_id = ?",
+            [(meme_id, tag_id) for tag_id in existing_tags - selected_tags]
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO meme_tags (meme_id, tag_id) VALUES (?, ?)",
+            [(meme_id, tag_id) for tag_id in selected_tags - existing_tags]
+        )
         
         conn.commit()
-        conn.close()
         
         # Redirect back to index with filters preserved
-        from flask import redirect, url_for
         redirect_params = []
         if search_query:
             redirect_params.append(f"search={search_query}")
@@ -1425,28 +1642,28 @@ def meme_detail(meme_id):
     row = cursor.fetchone()
     
     if not row:
-        conn.close()
         return "Meme not found", 404
     
     file_name = Path(row['file_path']).name
     file_path_obj = Path(row['file_path'])
     media_type = row['media_type']
-    memes_dir = get_memes_dir()
+    memes_dir_path = Path(get_memes_dir())
+    url_base = get_memes_url_base_dynamic()
     
     # Build proper URLs based on media type
     if media_type == 'video':
         # Use thumbnail for preview, original file for video player
         video_stem = file_path_obj.stem
         try:
-            relative_path = file_path_obj.relative_to(Path(memes_dir))
-            video_url = get_memes_url_base_dynamic() + relative_path.as_posix()
+            relative_path = file_path_obj.relative_to(memes_dir_path)
+            video_url = url_base + relative_path.as_posix()
             # Build thumbnail path in _system/thumbnails
             parent_relative = relative_path.parent
             thumbnail_relative = Path('_system') / 'thumbnails' / parent_relative / f"{video_stem}_thumb.jpg"
-            image_url = get_memes_url_base_dynamic() + thumbnail_relative.as_posix()
+            image_url = url_base + thumbnail_relative.as_posix()
         except ValueError:
-            video_url = get_memes_url_base_dynamic() + file_name
-            image_url = get_memes_url_base_dynamic() + f"_system/thumbnails/{video_stem}_thumb.jpg"
+            video_url = url_base + file_name
+            image_url = url_base + f"_system/thumbnails/{video_stem}_thumb.jpg"
     elif media_type == 'album':
         # For albums, no single image; compute first item as default image
         cursor.execute(
@@ -1462,19 +1679,19 @@ def meme_detail(meme_id):
         for p in album_item_paths:
             p_obj = Path(p)
             try:
-                rel = p_obj.relative_to(Path(memes_dir))
-                album_item_urls.append(get_memes_url_base_dynamic() + rel.as_posix())
+                rel = p_obj.relative_to(memes_dir_path)
+                album_item_urls.append(url_base + rel.as_posix())
             except ValueError:
-                album_item_urls.append(get_memes_url_base_dynamic() + p_obj.name)
+                album_item_urls.append(url_base + p_obj.name)
         image_url = album_item_urls[0] if album_item_urls else None
         video_url = None
     else:
         # For images/gifs, calculate relative path for URL
         try:
-            relative_path = file_path_obj.relative_to(Path(memes_dir))
-            image_url = get_memes_url_base_dynamic() + relative_path.as_posix()
+            relative_path = file_path_obj.relative_to(memes_dir_path)
+            image_url = url_base + relative_path.as_posix()
         except ValueError:
-            image_url = get_memes_url_base_dynamic() + file_name
+            image_url = url_base + file_name
         video_url = None
     
     meme = {
@@ -1525,112 +1742,19 @@ def meme_detail(meme_id):
     current_tags = [r['id'] for r in cursor.fetchall()]
     
     # Get prev/next meme IDs based on current filters
-    # Build filtered query
-    nav_sql = """
-        SELECT DISTINCT m.id, m.created_at
-        FROM memes m
-        WHERE 1=1
-    """
-    nav_params = []
-    
-    if status_filter:
-        nav_sql += " AND m.status = ?"
-        nav_params.append(status_filter)
-    
-    if tag_filter:
-        nav_sql += """ AND m.id IN (
-            SELECT meme_id FROM meme_tags WHERE tag_id = ?
-        )"""
-        nav_params.append(tag_filter)
-    
-    if media_filter:
-        nav_sql += " AND m.media_type = ?"
-        nav_params.append(media_filter)
-
-    if search_query:
-        nav_sql += """ AND (
-            LOWER(m.file_path) LIKE LOWER(?) OR
-            LOWER(m.ref_content) LIKE LOWER(?) OR
-            LOWER(m.template) LIKE LOWER(?) OR
-            LOWER(m.caption) LIKE LOWER(?) OR
-            LOWER(m.description) LIKE LOWER(?) OR
-            LOWER(m.meaning) LIKE LOWER(?)
-        )"""
-        search_pattern = f"%{search_query}%"
-        nav_params.extend([search_pattern] * 6)
-
-    nav_sql += " ORDER BY m.created_at DESC"
-
-    cursor.execute(nav_sql, nav_params)
-    all_filtered_ids = [r['id'] for r in cursor.fetchall()]
-
-    # Find current position and get prev/next
-    prev_id = None
-    next_id = None
-    try:
-        current_index = all_filtered_ids.index(meme_id)
-        if current_index > 0:
-            prev_id = all_filtered_ids[current_index - 1]
-        if current_index < len(all_filtered_ids) - 1:
-            next_id = all_filtered_ids[current_index + 1]
-    except ValueError:
-        # Current meme not in filtered list (shouldn't happen but handle it)
-        pass
-
-    # Get prev/next meme IDs based on current filters
-    # Build filtered query
-    nav_sql = """
-        SELECT DISTINCT m.id, m.created_at
-        FROM memes m
-        WHERE 1=1
-    """
-    nav_params = []
-
-    if status_filter:
-        nav_sql += " AND m.status = ?"
-        nav_params.append(status_filter)
-
-    if tag_filter:
-        nav_sql += """ AND m.id IN (
-            SELECT meme_id FROM meme_tags WHERE tag_id = ?
-        )"""
-        nav_params.append(tag_filter)
+    # Same search semantics as the index page, so navigation walks the same list
+    search_match = build_search_match(search_query) if search_query else None
 
-    if media_filter:
-        nav_sql += " AND m.media_type = ?"
-        nav_params.append(media_filter)
-
-    if search_query:
-        nav_sql += """ AND (
-            LOWER(m.file_path) LIKE LOWER(?) OR
-            LOWER(m.ref_content) LIKE LOWER(?) OR
-            LOWER(m.template) LIKE LOWER(?) OR
-            LOWER(m.caption) LIKE LOWER(?) OR
-            LOWER(m.description) LIKE LOWER(?) OR
-            LOWER(m.meaning) LIKE LOWER(?)
-        )"""
-        search_pattern = f"%{search_query}%"
-        nav_params.extend([search_pattern] * 6)
-    
-    nav_sql += " ORDER BY m.created_at DESC"
-    
-    cursor.execute(nav_sql, nav_params)
-    all_filtered_ids = [r['id'] for r in cursor.fetchall()]
-    
-    # Find current position and get prev/next
-    prev_id = None
-    next_id = None
-    try:
-        current_index = all_filtered_ids.index(meme_id)
-        if current_index > 0:
-            prev_id = all_filtered_ids[current_index - 1]
-        if current_index < len(all_filtered_ids) - 1:
-            next_id = all_filtered_ids[current_index + 1]
-    except ValueError:
-        # Current meme not in filtered list (shouldn't happen but handle it)
-        pass
+    nav_where, nav_params = _build_filter_clauses(status_filter, tag_filter, media_filter, search_match)
+    created_at = row['created_at']
     
-    conn.close()
+    cursor.execute(NAV_PREV_SQL[nav_where], nav_params + [created_at, created_at, meme_id])
+    prev_row = cursor.fetchone()
+    prev_id = prev_row['id'] if prev_row else None
+
+    cursor.execute(NAV_NEXT_SQL[nav_where], nav_params + [created_at, created_at, meme_id])
+    next_row = cursor.fetchone()
+    next_id = next_row['id'] if next_row else None
     
     saved = request.method == 'POST'
     
@@ -1653,6 +1777,16 @@ def meme_detail(meme_id):
                           prev_id=prev_id, next_id=next_id, query_string=query_string, clippy_agent=get_clippy_agent(), is_public_mode=is_public_mode(),
                           base_url=base_url)
 
+def _remove_meme_file(file_path):
+    """Unlink a meme file after its row is gone; a file that is already missing is fine"""
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # File deleted from DB but not filesystem - log but don't fail
+        app.logger.warning(f"Could not delete file {file_path}: {e}")
+
 @app.route('/api/memes/<int:meme_id>', methods=['DELETE'])
 @login_required
 def delete_meme(meme_id):
@@ -1661,28 +1795,22 @@ def delete_meme(meme_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Get file path before deleting
-    cursor.execute("SELECT file_path FROM memes WHERE id = ?", (meme_id,))
-    row = cursor.fetchone()
-    
-    if not row:
-        conn.close()
-        return {'success': False, 'error': 'Meme not found'}, 404
-    
-    file_path = row['file_path']
-    
-    # Delete from database (CASCADE will handle meme_tags)
-    cursor.execute("DELETE FROM memes WHERE id = ?", (meme_id,))
-    conn.commit()
-    conn.close()
+    with conn:
+        # Get file path before deleting
+        cursor.execute("SELECT file_path FROM memes WHERE id = ?", (meme_id,))
+        row = cursor.fetchone()
+        
+        if not row:
+            return {'success': False, 'error': 'Meme not found'}, 404
+        
+        file_path = row['file_path']
+        
+        # Delete from database (CASCADE will handle meme_tags)
+        cursor.execute("DELETE FROM memes WHERE id = ?", (meme_id,))
     
     # Delete file from filesystem
-    try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-    except Exception as e:
-        # File deleted from DB but not filesystem - log but don't fail
-        print(f"Warning: Could not delete file {file_path}: {e}")
+    _remove_meme_file(file_path)
+    invalidate_cached_directory_size()
     
     return {'success': True}
 
@@ -1700,25 +1828,22 @@ def bulk_delete():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Get all file paths
-    placeholders = ','.join('?' * len(ids))
-    cursor.execute(f"SELECT id, file_path FROM memes WHERE id IN ({placeholders})", ids)
-    memes = cursor.fetchall()
-    
-    # Delete from database
-    cursor.execute(f"DELETE FROM memes WHERE id IN ({placeholders})", ids)
-    conn.commit()
-    conn.close()
+    # Ids are bound as one JSON array, so the statement text is the same for any selection size
+    ids_json = json.dumps(ids)
+    with conn:
+        # Get all file paths
+        file_paths = [row[0] for row in cursor.execute(
+            "SELECT file_path FROM memes WHERE id IN (SELECT value FROM json_each(?))", (ids_json,)
+        )]
+        
+        # Delete from database
+        cursor.execute("DELETE FROM memes WHERE id IN (SELECT value FROM json_each(?))", (ids_json,))
+        deleted_count = cursor.rowcount
     
     # Delete files from filesystem
-    deleted_count = 0
-    for meme in memes:
-        try:
-            if os.path.exists(meme['file_path']):
-                os.remove(meme['file_path'])
-                deleted_count += 1
-        except Exception as e:
-            print(f"Warning: Could not delete file {meme['file_path']}: {e}")
+    for file_path in file_paths:
+        _remove_meme_file(file_path)
+    invalidate_cached_directory_size()
     
     return {'success': True, 'deleted': deleted_count}
 
@@ -1737,27 +1862,25 @@ def bulk_tags():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    added_count = 0
-    removed_count = 0
-    
-    # Add checked tags to all selected memes
-    for meme_id in meme_ids:
-        for tag_id in tag_ids:
-            try:
-                cursor.execute("INSERT INTO meme_tags (meme_id, tag_id) VALUES (?, ?)", (meme_id, tag_id))
-                added_count += 1
-            except sqlite3.IntegrityError:
-                # Tag already exists for this meme, skip
-                pass
-    
-    # Remove unchecked tags from all selected memes
-    for meme_id in meme_ids:
-        for tag_id in remove_tag_ids:
-            cursor.execute("DELETE FROM meme_tags WHERE meme_id = ? AND tag_id = ?", (meme_id, tag_id))
-            removed_count += 1
-    
-    conn.commit()
-    conn.close()
+    # The id lists go in as two JSON arrays and SQLite pairs them up itself, so
+    # each change is one statement no matter how many memes x tags are selected.
+    # Both run in one transaction: one commit, and nothing applied if either fails
+    meme_ids_json = json.dumps(meme_ids)
+    with conn:
+        # Add checked tags to all selected memes (pairs that already exist are skipped)
+        cursor.execute("""
+            INSERT OR IGNORE INTO meme_tags (meme_id, tag_id)
+            SELECT m.value, t.value FROM json_each(?) m, json_each(?) t
+        """, (meme_ids_json, json.dumps(tag_ids)))
+        added_count = max(cursor.rowcount, 0)
+        
+        # Remove unchecked tags from all selected memes
+        cursor.execute("""
+            DELETE FROM meme_tags
+            WHERE meme_id IN (SELECT value FROM json_each(?))
+              AND tag_id IN (SELECT value FROM json_each(?))
+        """, (meme_ids_json, json.dumps(remove_tag_ids)))
+        removed_count = max(cursor.rowcount, 0)
     
     return {'success': True, 'added': added_count, 'removed': removed_count}
 
@@ -1778,7 +1901,6 @@ def update_album_order(album_id: int):
         # Verify album exists and is of type 'album'
         cursor.execute("SELECT id FROM memes WHERE id = ? AND media_type = 'album'", (album_id,))
         if cursor.fetchone() is None:
-            conn.close()
             return jsonify({'success': False, 'error': 'Album not found'}), 404
 
         # Fetch current item paths for validation
@@ -1795,35 +1917,28 @@ def update_album_order(album_id: int):
 
         # Optional strict validation: ensure same set of items
         if set(current_paths) != set(items):
-            conn.close()
             return jsonify({'success': False, 'error': 'Items mismatch with current album'}), 400
 
-        # Temporarily shift existing orders to avoid UNIQUE collisions during in-place updates
-        cursor.execute(
-            "UPDATE album_items SET display_order = display_order + 100000 WHERE album_id = ?",
-            (album_id,)
-        )
-
-        # Update order to the new compact sequence
-        for idx, path in enumerate(items, start=1):
+        # Shift and renumber in one transaction (rolled back if anything fails)
+        with conn:
+            # Temporarily shift existing orders to avoid UNIQUE collisions during in-place updates
             cursor.execute(
+                "UPDATE album_items SET display_order = display_order + 100000 WHERE album_id = ?",
+                (album_id,)
+            )
+
+            # Update order to the new compact sequence
+            cursor.executemany(
                 """
                 UPDATE album_items
                 SET display_order = ?
                 WHERE album_id = ? AND file_path = ?
                 """,
-                (idx, album_id, path)
+                [(idx, album_id, path) for idx, path in enumerate(items, start=1)]
             )
 
-        conn.commit()
-        conn.close()
         return jsonify({'success': True})
     except Exception as e:
-        try:
-            conn.rollback()
-            conn.close()
-        except Exception:
-            pass
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/bulk-memes-tags', methods=['POST'])
@@ -1839,34 +1954,22 @@ def bulk_memes_tags():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Get tags that ALL selected memes have (full)
-    placeholders = ','.join('?' * len(meme_ids))
-    cursor.execute(f"""
-        SELECT tag_id 
+    # Count how many selected memes carry each tag in one pass:
+    # tags on ALL selected memes are full, tags on SOME of them are partial
+    cursor.execute("""
+        SELECT tag_id, COUNT(DISTINCT meme_id)
         FROM meme_tags 
-        WHERE meme_id IN ({placeholders})
+        WHERE meme_id IN (SELECT value FROM json_each(?))
         GROUP BY tag_id
-        HAVING COUNT(DISTINCT meme_id) = ?
-    """, meme_ids + [len(meme_ids)])
-    
-    full_tag_ids = [row[0] for row in cursor.fetchall()]
-    
-    # Get tags that SOME (but not all) selected memes have (partial)
-    cursor.execute(f"""
-        SELECT DISTINCT tag_id 
-        FROM meme_tags 
-        WHERE meme_id IN ({placeholders}) AND tag_id NOT IN (
-            SELECT tag_id 
-            FROM meme_tags 
-            WHERE meme_id IN ({placeholders})
-            GROUP BY tag_id
-            HAVING COUNT(DISTINCT meme_id) = ?
-        )
-    """, meme_ids + meme_ids + [len(meme_ids)])
-    
-    partial_tag_ids = [row[0] for row in cursor.fetchall()]
+    """, (json.dumps(meme_ids),))
     
-    conn.close()
+    full_tag_ids = []
+    partial_tag_ids = []
+    for tag_id, meme_count in cursor.fetchall():
+        if meme_count == len(meme_ids):
+            full_tag_ids.append(tag_id)
+        else:
+            partial_tag_ids.append(tag_id)
     
     return {
         'success': True, 
@@ -1885,11 +1988,17 @@ def settings():
     
     if os.path.exists(log_path):
         try:
-            with open(log_path, 'r') as f:
-                content = f.read()
+            # The log only grows, so read just its tail rather than the whole file
+            with open(log_path, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - SCAN_LOG_TAIL_BYTES))
+                content = f.read().decode('utf-8', errors='ignore')
+                if size > SCAN_LOG_TAIL_BYTES:
+                    # Drop the partial line the read started in
+                    content = content[content.find('\n') + 1:]
                 
                 # Split by the separator line
-                separator = "================================"
+                separator = SCAN_LOG_SEPARATOR
                 parts = content.split(separator)
                 
                 # We want the last complete entry which is:
@@ -1946,87 +2055,46 @@ def trigger_action():
     
     if action == 'scan':
         # Run scan and process in background
-        script_dir = get_script_dir()
-        log_dir = get_log_dir()
-        
         # Check if Replicate API key is configured
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM settings WHERE key = 'replicate_api_key'")
-        api_key_row = cursor.fetchone()
-        conn.close()
+        api_key = get_cached_setting('replicate_api_key')
         
-        if not (api_key_row and api_key_row[0].strip()):
+        if not (api_key and api_key.strip()):
             # Check if we have it in env (e.g. from sitecustomize or manual env var)
             if not os.environ.get('REPLICATE_API_TOKEN'):
                 return {'success': False, 'message': 'Replicate API key not configured. Please set it in Settings first.'}
         
-        try:
-            # Set up environment variables for the shell script
-            env = os.environ.copy()
-            env['SCRIPT_DIR'] = script_dir  # Instance directory (for files, logs, etc.)
-            env['LOG_DIR'] = log_dir
-            env['DB_PATH'] = get_db_path()
-            env['MEMES_DIR'] = get_memes_dir()
-            env['MEMES_URL_BASE'] = get_memes_url_base()  # Critical for Replicate API image URLs
-            env['VENV_DIR'] = get_venv_dir()
-            # Ensure PATH includes standard locations for bash
-            env['PATH'] = '/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin'
-            
-            # Script resolution using configuration
-            script_dir = app.config.get('HELPER_SCRIPTS_DIR', get_script_dir())
-            shell_script = os.path.join(script_dir, 'run_scan.sh')
-            
-            # Use full path to bash to avoid PATH issues in systemd
-            bash_path = '/bin/bash'
-            if not os.path.exists(bash_path):
-                bash_path = '/usr/bin/bash'
-            
-            subprocess.Popen(
-                [bash_path, shell_script],
-                stdout=subprocess.DEVNULL,
-                stderr=open(os.path.join(log_dir, 'scan_errors.log'), 'a'),
-                env=env,
-                start_new_session=True
-            )
-            return {'success': True, 'message': 'Scan started in background! Check logs for progress.'}
-        except Exception as e:
-            return {'success': False, 'message': f'Failed to start scan: {str(e)}'}
+        # Launched from the background pool; launch failures are logged there
+        start_scan()
+        return {'success': True, 'message': 'Scan queued in background! Check logs for progress.'}
     
     elif action == 'retry_errors':
         # Run retry errors in background using dedicated script
         script_dir = get_script_dir()
-        log_dir = get_log_dir()
         
-        try:
-            # Set up environment variables for the shell script
-            env = os.environ.copy()
-            env['SCRIPT_DIR'] = script_dir  # Instance directory (for files, logs, etc.)
-            env['LOG_DIR'] = log_dir
-            env['DB_PATH'] = get_db_path()
-            env['MEMES_DIR'] = get_memes_dir()
-            env['MEMES_URL_BASE'] = get_memes_url_base()  # Critical for Replicate API image URLs
-            env['VENV_DIR'] = get_venv_dir()
-            
-            # Script resolution using configuration
-            script_dir = app.config.get('HELPER_SCRIPTS_DIR', get_script_dir())
-            shell_script = os.path.join(script_dir, 'retry_errors.sh')
-
-            
-            subprocess.Popen(
-                [shell_script],
-                stdout=subprocess.DEVNULL,
-                stderr=open(os.path.join(log_dir, 'scan_errors.log'), 'a'),
-                env=env,
-                start_new_session=True
-            )
-            return {'success': True, 'message': 'Error reprocessing started in background! Check logs for progress.'}
-        except Exception as e:
-            return {'success': False, 'message': f'Failed to start retry: {str(e)}'}
+        # Set up environment variables for the shell script
+        env = os.environ.copy()
+        env['SCRIPT_DIR'] = script_dir  # Instance directory (for files, logs, etc.)
+        env['LOG_DIR'] = get_log_dir()
+        env['DB_PATH'] = get_db_path()
+        env['MEMES_DIR'] = get_memes_dir()
+        env['MEMES_URL_BASE'] = get_memes_url_base()  # Critical for Replicate API image URLs
+        env['VENV_DIR'] = get_venv_dir()
+        
+        # Script resolution using configuration
+        script_dir = app.config.get('HELPER_SCRIPTS_DIR', get_script_dir())
+        shell_script = os.path.join(script_dir, 'retry_errors.sh')
+        
+        # Launched from the background pool; launch failures are logged there
+        _launch_background(
+            [shell_script],
+            get_log_file('scan_errors.log'),
+            capture_stdout=False,
+            env=env
+        )
+        return {'success': True, 'message': 'Error reprocessing queued in background! Check logs for progress.'}
     
     elif action == 'scan_tags_all':
         # Run tags-only scan for all memes using process_memes.py
-        from datetime import datetime
         instance_dir = get_script_dir()  # Instance directory
         venv_dir = get_venv_dir()
         venv_python = os.path.join(venv_dir, "bin", "python")
@@ -2037,8 +2105,7 @@ def trigger_action():
         working_dir = script_dir  # Run in the script directory to ensure imports work
 
         
-        log_file = os.path.join(get_log_dir(), "scan.log")
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        log_file = get_scan_log_file()
         try:
             # Set up environment variables for the Python script
             env = os.environ.copy()
@@ -2050,21 +2117,21 @@ def trigger_action():
             env['VENV_DIR'] = get_venv_dir()
             
             ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(log_file, 'a', encoding='utf-8') as lf:
-                lf.write("================================\n")
-                lf.write(f"{ts}: Triggered tags-only scan for ALL memes via UI\n")
-                lf.write(f"Process script: {script_path}\n")
-                lf.write(f"Working dir: {working_dir}\n")
-                lf.write("================================\n")
-                python_exec = venv_python if os.path.exists(venv_python) else "python3"
-                subprocess.Popen(
-                    [python_exec, script_path, '--scan-tags-all'],
-                    cwd=working_dir,
-                    env=env,
-                    stdout=lf,
-                    stderr=lf,
-                    start_new_session=True
-                )
+            header = (
+                f"{SCAN_LOG_SEPARATOR}\n"
+                f"{ts}: Triggered tags-only scan for ALL memes via UI\n"
+                f"Process script: {script_path}\n"
+                f"Working dir: {working_dir}\n"
+                f"{SCAN_LOG_SEPARATOR}\n"
+            ).encode('utf-8')
+            python_exec = venv_python if os.path.exists(venv_python) else "python3"
+            _launch_background(
+                [python_exec, script_path, '--scan-tags-all'],
+                log_file,
+                header=header,
+                cwd=working_dir,
+                env=env
+            )
             return {'success': True, 'message': 'Tags-only scan started in background!'}
         except Exception as e:
             return {'success': False, 'message': str(e)}
@@ -2075,21 +2142,27 @@ def trigger_action():
 @login_required
 def scan_tags_single_meme(meme_id: int):
     """Trigger a tags-only scan for a single meme (path + AI-from-text)."""
-    import subprocess
-    from datetime import datetime
 
     script_dir = get_script_dir()
     venv_dir = get_venv_dir()
     venv_python = os.path.join(venv_dir, "bin", "python")
     script_path = os.path.join(script_dir, "process_memes.py")
-    log_file = os.path.join(get_log_dir(), "scan.log")
-
-    # Ensure logs directory exists
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    log_file = get_scan_log_file()
 
     # Log header
     try:
         job_id = str(uuid4())
+        # Record the job so status polls don't have to search the log. Finished
+        # jobs older than a day are dropped here as well, and so are jobs still
+        # pending after a week (their process died before recording completion)
+        conn = get_db_connection()
+        with conn:
+            conn.execute("""
+                DELETE FROM scan_jobs
+                WHERE (status = 'completed' AND updated_at < datetime('now', '-1 day'))
+                   OR updated_at < datetime('now', '-7 days')
+            """)
+            conn.execute("INSERT INTO scan_jobs (job_id, status) VALUES (?, 'pending')", (job_id,))
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         with open(log_file, 'a', encoding='utf-8') as lf:
             lf.write("================================\n")
@@ -2111,8 +2184,6 @@ def scan_tags_single_meme(meme_id: int):
 @login_required
 def bulk_scan_tags():
     """Trigger tags-only scan for a set of selected meme IDs."""
-    import subprocess
-    from datetime import datetime
     data = request.get_json(silent=True) or {}
     meme_ids = data.get('meme_ids', [])
     if not meme_ids:
@@ -2129,8 +2200,7 @@ def bulk_scan_tags():
     venv_dir = get_venv_dir()
     venv_python = os.path.join(venv_dir, "bin", "python")
     script_path = os.path.join(script_dir, "process_memes.py")
-    log_file = os.path.join(get_log_dir(), "scan.log")
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    log_file = get_scan_log_file()
     try:
         with open(log_file, 'a', encoding='utf-8') as lf:
             lf.write("================================\n")
@@ -2151,24 +2221,12 @@ def bulk_scan_tags():
 @app.route('/api/jobs/<job_id>/status', methods=['GET'])
 @login_required
 def job_status(job_id: str):
-    """Return scan-tag job status by scanning the log for the COMPLETE marker."""
-    import re
-    log_file = os.path.join(get_log_dir(), "scan.log")
-    if not os.path.exists(log_file):
-        return {'success': True, 'status': 'pending'}
-
+    """Return scan-tag job status as recorded in the scan_jobs table."""
     try:
-        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-
-        # Example complete line: TAGSCAN JOB <job_id> COMPLETE id=123 applied=true
-        pattern = rf"TAGSCAN JOB {re.escape(job_id)} COMPLETE .*?applied=(true|false)"
-        m = re.search(pattern, content)
-        if m:
-            applied = (m.group(1).lower() == 'true')
-            return {'success': True, 'status': 'completed', 'applied': applied}
-        if f"TAGSCAN JOB {job_id} START" in content:
-            return {'success': True, 'status': 'pending'}
+        conn = get_db_connection()
+        row = conn.execute("SELECT status, applied FROM scan_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row and row['status'] == 'completed':
+            return {'success': True, 'status': 'completed', 'applied': bool(row['applied'])}
         return {'success': True, 'status': 'pending'}
     except Exception as e:
         return {'success': False, 'error': str(e)}, 500
@@ -2177,8 +2235,6 @@ def job_status(job_id: str):
 @login_required
 def process_single_meme(meme_id: int):
     """Trigger processing of a single meme in background and log to scan.log."""
-    import subprocess
-    from datetime import datetime
 
     instance_dir = get_script_dir()  # Instance directory
     venv_dir = get_venv_dir()
@@ -2190,30 +2246,22 @@ def process_single_meme(meme_id: int):
     working_dir = script_dir
 
     
-    log_file = os.path.join(get_log_dir(), "scan.log")
+    log_file = get_scan_log_file()
 
     # Mark meme as processing in DB
     try:
         conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE memes
-            SET status='processing', error_message=NULL, updated_at=CURRENT_TIMESTAMP
-            WHERE id=?
-            """,
-            (meme_id,)
-        )
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute(
+                """
+                UPDATE memes
+                SET status='processing', error_message=NULL, updated_at=CURRENT_TIMESTAMP
+                WHERE id=?
+                """,
+                (meme_id,)
+            )
     except Exception:
-        try:
-            conn.close()
-        except Exception:
-            pass
-
-    # Ensure logs directory exists
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        pass
 
     # Prepend a header line to the log synchronously
     try:
@@ -2251,34 +2299,8 @@ def process_single_meme(meme_id: int):
                 start_new_session=True
             )
             
-            # Start a background thread to monitor the process and update status on failure
-            def monitor_processing():
-                import threading
-                import time
-                try:
-                    # Wait for process to complete (max 60 seconds)
-                    exit_code = proc.wait(timeout=60)
-                    if exit_code != 0:
-                        # Processing failed, update meme status to error
-                        conn = get_db_connection()
-                        cursor = conn.cursor()
-                        cursor.execute(
-                            "UPDATE memes SET status='error', error_message=?, updated_at=CURRENT_TIMESTAMP WHERE id=?",
-                            (f"Manual processing failed with exit code {exit_code}", meme_id)
-                        )
-                        conn.commit()
-                        conn.close()
-                        lf.write(f"Updated meme {meme_id} status to error (exit code: {exit_code})\n")
-                except subprocess.TimeoutExpired:
-                    # Process is still running after 60 seconds, that's normal for processing
-                    pass
-                except Exception as monitor_error:
-                    lf.write(f"Error monitoring process for meme {meme_id}: {monitor_error}\n")
-            
-            # Start monitoring in a separate thread
-            import threading
-            monitor_thread = threading.Thread(target=monitor_processing, daemon=True)
-            monitor_thread.start()
+            # Mark the meme as failed if the process exits with an error
+            watch_process(proc, get_db_path(), log_file, 'meme', meme_id, "Manual processing failed")
             
         return {'success': True, 'message': 'Processing started'}
     except Exception as e:
@@ -2291,7 +2313,6 @@ def process_single_meme(meme_id: int):
                 (f"Failed to start manual processing: {str(e)}", meme_id)
             )
             conn.commit()
-            conn.close()
         except Exception as db_error:
             pass  # If DB update also fails, we can't do much
         return {'success': False, 'error': str(e)}, 500
@@ -2302,22 +2323,19 @@ def get_meme(meme_id: int):
     """Return current meme fields for polling/progress UI."""
     conn = get_db_connection()
     cursor = conn.cursor()
+    # Current tag ids come back in the same row as a JSON array
     cursor.execute(
         """
-        SELECT id, title, status, media_type, file_path, ref_content, template, caption, description, meaning, error_message, created_at, updated_at
+        SELECT id, title, status, media_type, file_path, ref_content, template, caption, description, meaning, error_message, created_at, updated_at,
+               (SELECT json_group_array(tag_id) FROM meme_tags WHERE meme_id = memes.id) AS tag_ids_json
         FROM memes WHERE id = ?
         """,
         (meme_id,)
     )
     row = cursor.fetchone()
     if not row:
-        conn.close()
         return {'success': False, 'error': 'Meme not found'}, 404
-    # Fetch current tag ids for this meme
-    cursor.execute("SELECT tag_id FROM meme_tags WHERE meme_id = ?", (meme_id,))
-    tag_rows = cursor.fetchall()
-    tag_ids = [r[0] if not isinstance(r, sqlite3.Row) else r['tag_id'] for r in tag_rows]
-    conn.close()
+    tag_ids = json.loads(row['tag_ids_json'])
     resp = jsonify({
         'success': True,
         'meme': {
@@ -2349,7 +2367,6 @@ def get_random_meme():
     cursor = conn.cursor()
     cursor.execute("SELECT id FROM memes ORDER BY RANDOM() LIMIT 1")
     row = cursor.fetchone()
-    conn.close()
     
     if not row:
         return jsonify({'success': False, 'error': 'No memes found'}), 404
@@ -2385,19 +2402,16 @@ def tags():
             'created_at': row['created_at']
         })
     
-    conn.close()
-    
     # Get base URL for API calls (for multi-tenant support)
     base_url = request.environ.get('SCRIPT_NAME', '')
     
     return render_template('tags.html', tags=tags_list, clippy_agent=get_clippy_agent(), base_url=base_url)
 
-@app.route('/api/tags', methods=['POST'])
-@login_required
-def create_tag():
-    """Create a new tag"""
-    data = request.get_json()
-    
+def _save_tag(data, tag_id=None):
+    """Validate a tag form and insert it (tag_id None) or update tag_id, in one transaction.
+
+    Returns the response for the create/update endpoints.
+    """
     # Validate tag name and description lengths
     tag_name = data.get('name', '').strip()
     tag_description = data.get('description', '').strip()
@@ -2411,140 +2425,98 @@ def create_tag():
     if len(tag_description) > MAX_TAG_DESCRIPTION_LENGTH:
         return {'success': False, 'error': f'Tag description too long (max {MAX_TAG_DESCRIPTION_LENGTH} characters)'}
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    values = (
+        tag_name,
+        tag_description,
+        data['color'],
+        int(bool(data.get('parse_from_filename', True))),
+        int(bool(data.get('ai_can_suggest', True)))
+    )
     
+    conn = get_db_connection()
     try:
-        cursor.execute("""
-            INSERT INTO tags (name, description, color, parse_from_filename, ai_can_suggest)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            tag_name,
-            tag_description,
-            data['color'],
-            1 if data.get('parse_from_filename', True) else 0,
-            1 if data.get('ai_can_suggest', True) else 0
-        ))
-        conn.commit()
-        tag_id = cursor.lastrowid
-        conn.close()
-        return {'success': True, 'id': tag_id}
+        with conn:
+            if tag_id is None:
+                tag_id = conn.execute("""
+                    INSERT INTO tags (name, description, color, parse_from_filename, ai_can_suggest)
+                    VALUES (?, ?, ?, ?, ?)
+                    RETURNING id
+                """, values).fetchone()[0]
+                return {'success': True, 'id': tag_id}
+            
+            conn.execute("""
+                UPDATE tags
+                SET name = ?, description = ?, color = ?, 
+                    parse_from_filename = ?, ai_can_suggest = ?
+                WHERE id = ?
+            """, values + (tag_id,))
+            return {'success': True}
     except sqlite3.IntegrityError:
-        conn.close()
         return {'success': False, 'error': 'Tag name already exists'}
 
+@app.route('/api/tags', methods=['POST'])
+@login_required
+def create_tag():
+    """Create a new tag"""
+    return _save_tag(request.get_json())
+
 @app.route('/api/tags/<int:tag_id>', methods=['PUT'])
 @login_required
 def update_tag(tag_id):
     """Update a tag"""
-    data = request.get_json()
-    
-    # Validate tag name and description lengths
-    tag_name = data.get('name', '').strip()
-    tag_description = data.get('description', '').strip()
-    
-    if not tag_name:
-        return {'success': False, 'error': 'Tag name is required'}
-    
-    if len(tag_name) > MAX_TAG_NAME_LENGTH:
-        return {'success': False, 'error': f'Tag name too long (max {MAX_TAG_NAME_LENGTH} characters)'}
-    
-    if len(tag_description) > MAX_TAG_DESCRIPTION_LENGTH:
-        return {'success': False, 'error': f'Tag description too long (max {MAX_TAG_DESCRIPTION_LENGTH} characters)'}
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        UPDATE tags
-        SET name = ?, description = ?, color = ?, 
-            parse_from_filename = ?, ai_can_suggest = ?
-        WHERE id = ?
-    """, (
-        tag_name,
-        tag_description,
-        data['color'],
-        1 if data.get('parse_from_filename', True) else 0,
-        1 if data.get('ai_can_suggest', True) else 0,
-        tag_id
-    ))
-    
-    conn.commit()
-    conn.close()
-    
-    return {'success': True}
+    return _save_tag(request.get_json(), tag_id)
 
 @app.route('/api/tags/<int:tag_id>', methods=['DELETE'])
 @login_required
 def delete_tag(tag_id):
     """Delete a tag"""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM tags WHERE id = ?", (tag_id,))
-    
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute("DELETE FROM tags WHERE id = ?", (tag_id,))
     
     return {'success': True}
 
+# Agents only change on deployment, so the scan is redone only when the agents
+# directory's mtime changes (an agent folder was added, removed or renamed)
+_clippy_agents_cache = {'mtime': None, 'agents': None}
+
+# The static folder is fixed per app (unlike the per-tenant data directories)
+CLIPPY_AGENTS_DIR = os.path.join(app.static_folder, 'clippy', 'agents')
+
+def list_clippy_agents():
+    """Sorted names of the installed Clippy agents, or None if the agents directory is missing"""
+    agents_dir = CLIPPY_AGENTS_DIR
+    try:
+        mtime = os.stat(agents_dir).st_mtime
+    except OSError:
+        return None
+    
+    if _clippy_agents_cache['mtime'] != mtime:
+        # Include agents that have an agent.js file (which means they're valid agents)
+        # The frontend will handle missing preview.png files gracefully
+        with os.scandir(agents_dir) as entries:
+            agents = sorted(
+                entry.name for entry in entries
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, 'agent.js'))
+            )
+        _clippy_agents_cache.update(mtime=mtime, agents=agents)
+    return _clippy_agents_cache['agents']
+
 @app.route('/api/clippy-agents', methods=['GET'])
 @login_required
 def get_clippy_agents():
     """Get list of available Clippy agents"""
-    agents_dir = Path(app.static_folder) / 'clippy' / 'agents'
-    agents = []
-    
-    if not agents_dir.exists():
+    agent_names = list_clippy_agents()
+    if agent_names is None:
         return jsonify({'success': False, 'error': 'Agents directory not found'})
     
-    # Scan agent directories
-    for agent_dir in agents_dir.iterdir():
-        if not agent_dir.is_dir():
-            continue
-        
-        agent_name = agent_dir.name
-        agent_js = agent_dir / 'agent.js'
-        
-        # Include agents that have an agent.js file (which means they're valid agents)
-        # The frontend will handle missing preview.png files gracefully
-        if agent_js.exists():
-            agents.append({
-                'name': agent_name
-            })
-    
-    # Sort agents by name
-    agents.sort(key=lambda x: x['name'])
-    
-    return jsonify({'success': True, 'agents': agents})
+    return jsonify({'success': True, 'agents': [{'name': name} for name in agent_names]})
 
 @app.route('/api/settings/clippy-agent', methods=['GET'])
 @login_required
 def get_clippy_agent_setting():
     """Get current Clippy agent selection"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Ensure settings table exists
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-    
-    cursor.execute("SELECT value FROM settings WHERE key = 'agent_form'")
-    row = cursor.fetchone()
-    if not row:
-        cursor.execute("INSERT INTO settings (key, value) VALUES ('agent_form', 'none')")
-        conn.commit()
-        agent_form = 'none'
-    else:
-        agent_form = row[0]
-    
-    conn.close()
-    
-    return jsonify({'success': True, 'agent_form': agent_form})
+    return jsonify({'success': True, 'agent_form': get_clippy_agent()})
 
 @app.route('/api/settings/clippy-agent', methods=['POST'])
 @login_required
@@ -2556,31 +2528,82 @@ def set_clippy_agent_setting():
     # Validate agent_form (should be 'none' or a valid agent name)
     if agent_form != 'none':
         # Check if agent exists
-        agents_dir = Path(app.static_folder) / 'clippy' / 'agents' / agent_form
-        if not agents_dir.exists():
+        if agent_form not in (list_clippy_agents() or ()):
             return jsonify({'success': False, 'error': 'Invalid agent name'})
     
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    # Ensure settings table exists
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-    
     cursor.execute(
         "INSERT OR REPLACE INTO settings (key, value) VALUES ('agent_form', ?)",
         (agent_form,)
     )
-    
     conn.commit()
-    conn.close()
+    invalidate_cached_setting('agent_form')
     
     return jsonify({'success': True, 'agent_form': agent_form})
 
+def _directory_size(root):
+    """Total size in bytes of the regular files under root, without following symlinks.
+
+    Uses os.scandir so file/directory checks come from the directory listing
+    itself; only the size needs a stat call.
+    """
+    total_size = 0
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return total_size
+
+# Walking the instance directory is the slow part of disk-usage and quota checks,
+# so the result is reused for a while. Keyed by path for multi-tenant deployments.
+# Uploads add their size to the cached total, so a burst of uploads never walks the
+# tree; deletes drop the entry, and the periodic recount corrects any drift from
+# files written by background processing.
+DISK_USAGE_CACHE_TTL = 300  # seconds
+# Uploads up to this size may be checked against a stale usage figure, as long as
+# that figure leaves them under this fraction of the quota
+QUOTA_FAST_PATH_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+QUOTA_FAST_PATH_MAX_FRACTION = 0.9
+_disk_usage_cache = {}
+
+def peek_cached_directory_size(root):
+    """Last computed size of root however old it is, or None if it was never computed"""
+    cached = _disk_usage_cache.get(str(root))
+    return cached[0] if cached is not None else None
+
+def get_cached_directory_size(root):
+    """_directory_size(root), cached for DISK_USAGE_CACHE_TTL seconds"""
+    cache_key = str(root)
+    cached = _disk_usage_cache.get(cache_key)
+    if cached is not None and time.monotonic() - cached[1] < DISK_USAGE_CACHE_TTL:
+        return cached[0]
+
+    total_size = _directory_size(root)
+    _disk_usage_cache[cache_key] = (total_size, time.monotonic())
+    return total_size
+
+def adjust_cached_directory_size(delta_bytes):
+    """Account for bytes written to the instance directory without recounting it"""
+    cache_key = str(Path(get_instance_path()))
+    cached = _disk_usage_cache.get(cache_key)
+    if cached is not None:
+        _disk_usage_cache[cache_key] = (max(0, cached[0] + delta_bytes), cached[1])
+
+def invalidate_cached_directory_size():
+    """Drop the cached instance disk usage after files were added or removed"""
+    _disk_usage_cache.pop(str(Path(get_instance_path())), None)
+
 @app.route('/api/settings/disk-usage', methods=['GET'])
 @login_required
 def get_disk_usage():
@@ -2590,13 +2613,7 @@ def get_disk_usage():
         disk_quota_mb = get_disk_quota_mb()
         
         # Calculate current disk usage
-        total_size = 0
-        for item in instance_path.rglob('*'):
-            if item.is_file():
-                try:
-                    total_size += item.stat().st_size
-                except (OSError, PermissionError):
-                    pass
+        total_size = get_cached_directory_size(instance_path)
         
         current_usage_mb = total_size / (1024 * 1024)
         
@@ -2615,7 +2632,6 @@ def get_disk_usage():
             })
         else:
             # No quota - show filesystem free space
-            import shutil
             stat = shutil.disk_usage(instance_path)
             total_mb = stat.total / (1024 * 1024)
             used_mb = stat.used / (1024 * 1024)
@@ -2705,7 +2721,6 @@ def get_version_info():
                 instance_path = Path(get_instance_path())
                 config_file = instance_path / 'config.json'
                 if config_file.exists():
-                    import json
                     with open(config_file, 'r') as f:
                         instance_config = json.load(f)
                         git_branch = instance_config.get('git_branch')
@@ -2738,7 +2753,6 @@ def get_version_info():
                     # Git repo exists but commit info failed - use CHANGELOG as fallback
                     current_version = get_current_version()
                     if not current_version:
-                        from init_database import get_version_from_changelog
                         changelog_version = get_version_from_changelog()
                         if changelog_version:
                             set_current_version(changelog_version)
@@ -2748,7 +2762,6 @@ def get_version_info():
             current_version = get_current_version()
             if not current_version:
                 # Try to get version from CHANGELOG.md and update database
-                from init_database import get_version_from_changelog
                 changelog_version = get_version_from_changelog()
                 if changelog_version:
                     set_current_version(changelog_version)
@@ -2768,7 +2781,6 @@ def get_version_info():
             cursor.execute("SELECT value FROM settings WHERE key = 'last_update_check'")
             row = cursor.fetchone()
             last_update_check = row[0] if row and row[0] else None
-            conn.close()
         except Exception:
             last_update_check = None
         
@@ -2793,19 +2805,11 @@ def get_replicate_usage():
         # Check if user has their own key (BYOK) - if so, quotas don't apply
         has_db_key = False
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM settings WHERE key = 'replicate_api_key'")
-            row = cursor.fetchone()
-            if row and row[0] and row[0].strip():
+            api_key = get_cached_setting('replicate_api_key')
+            if api_key and api_key.strip():
                 has_db_key = True
         except Exception:
             pass
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
         # If user has their own key, quotas don't apply (they bypass the proxy)
         if has_db_key:
@@ -2830,25 +2834,19 @@ def get_replicate_usage():
             # Try to fetch current usage from managing service
             # Read config.json to get proxy URL (same pattern as sitecustomize.py uses)
             try:
-                import requests
-                import json
-                from pathlib import Path
-                
                 # Get instance name from app config (set by wrapper in multi-tenant setup)
                 instance_name = app.config.get('INSTANCE_NAME')
                 if instance_name:
                     # Read config.json to get proxy URL (generic - just reads a config file)
-                    instance_path = get_instance_path()
-                    config_path = Path(instance_path) / 'config.json'
-                    if config_path.exists():
-                        with open(config_path, 'r') as f:
-                            config = json.load(f)
+                    config = read_instance_config()
+                    if config:
                         proxy_url = config.get('memelord_proxy_url')
                         if proxy_url:
                             # Derive usage URL from proxy URL (generic pattern)
                             usage_url = proxy_url.replace('/api/replicate-proxy', f'/api/replicate-usage/{instance_name}')
                             try:
-                                response = requests.get(usage_url, timeout=5)
+                                # Fail fast if the managing service can't be reached
+                                response = get_http_session().get(usage_url, timeout=(2, 5))
                                 if response.status_code == 200:
                                     usage_data = response.json()
                                     used = usage_data.get('used', 0)
@@ -2880,27 +2878,7 @@ def get_replicate_usage():
 @login_required
 def get_replicate_api_key_setting():
     """Get Replicate API key (masked for security)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Ensure settings table exists
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-    
-    cursor.execute("SELECT value FROM settings WHERE key = 'replicate_api_key'")
-    row = cursor.fetchone()
-    if not row:
-        cursor.execute("INSERT INTO settings (key, value) VALUES ('replicate_api_key', '')")
-        conn.commit()
-        api_key = ''
-    else:
-        api_key = row[0] or ''
-    
-    conn.close()
+    api_key = get_cached_setting('replicate_api_key') or ''
     
     # Mask the API key for display (show only last 4 characters)
     if api_key and len(api_key) > 4:
@@ -2910,6 +2888,27 @@ def get_replicate_api_key_setting():
     
     return jsonify({'success': True, 'api_key': masked_key, 'has_key': bool(api_key)})
 
+@app.route('/api/settings/replicate-api-key/status', methods=['GET'])
+@login_required
+def get_replicate_api_key_status():
+    """Whether a Replicate API key is set, with only its last 4 characters.
+
+    Read straight from the settings table so the key itself never reaches the
+    web worker. Keys of 4 characters or fewer get no hint at all.
+    """
+    conn = get_db_connection()
+    row = conn.execute("""
+        SELECT CASE WHEN length(value) > 4 THEN substr(value, -4) ELSE '' END, value != ''
+        FROM settings WHERE key = 'replicate_api_key'
+    """).fetchone()
+    last4, has_key = row if row else ('', False)
+    
+    return jsonify({
+        'success': True,
+        'has_key': bool(has_key),
+        'last4': last4 or ''
+    })
+
 @app.route('/api/settings/replicate-api-key', methods=['POST'])
 @login_required
 def set_replicate_api_key_setting():
@@ -2919,22 +2918,12 @@ def set_replicate_api_key_setting():
     
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    # Ensure settings table exists
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-    
     cursor.execute(
         "INSERT OR REPLACE INTO settings (key, value) VALUES ('replicate_api_key', ?)",
         (api_key,)
     )
-    
     conn.commit()
-    conn.close()
+    invalidate_cached_setting('replicate_api_key')
     
     return jsonify({'success': True, 'message': 'API key saved successfully'})
 
@@ -2945,18 +2934,9 @@ def get_ai_enabled_setting():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Ensure settings table exists
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-    
     # Get AI enabled setting (default is enabled/true)
     cursor.execute("SELECT value FROM settings WHERE key = 'ai_enabled'")
     result = cursor.fetchone()
-    conn.close()
     
     # Default to True (enabled) if not set
     ai_enabled = True
@@ -2975,14 +2955,6 @@ def set_ai_enabled_setting():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Ensure settings table exists
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-    
     # Store as string ('true' or 'false')
     cursor.execute(
         "INSERT OR REPLACE INTO settings (key, value) VALUES ('ai_enabled', ?)",
@@ -2990,7 +2962,6 @@ def set_ai_enabled_setting():
     )
     
     conn.commit()
-    conn.close()
     
     return jsonify({'success': True, 'message': 'AI enabled status updated', 'ai_enabled': ai_enabled})
 
@@ -3020,7 +2991,6 @@ def change_password():
     row = cursor.fetchone()
     
     if not row or not check_password_hash(row['password_hash'], current_password):
-        conn.close()
         return jsonify({'success': False, 'error': 'Current password is incorrect'}), 400
     
     # Update password
@@ -3031,7 +3001,6 @@ def change_password():
     )
     
     conn.commit()
-    conn.close()
     
     return jsonify({'success': True, 'message': 'Password changed successfully'})
 
@@ -3044,7 +3013,6 @@ def get_privacy_mode():
     cursor.execute("SELECT value FROM settings WHERE key = 'privacy_mode'")
     row = cursor.fetchone()
     privacy_mode = row['value'] if row else 'private'
-    conn.close()
     return jsonify({'success': True, 'privacy_mode': privacy_mode})
 
 @app.route('/api/settings/privacy-mode', methods=['POST'])
@@ -3064,20 +3032,45 @@ def set_privacy_mode():
         (privacy_mode,)
     )
     conn.commit()
-    conn.close()
+    invalidate_cached_setting('privacy_mode')
     
     return jsonify({'success': True, 'privacy_mode': privacy_mode})
 
-def get_file_hash(file_path):
-    """Compute SHA256 hash of file contents"""
-    try:
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-    except Exception:
-        return None
+def save_upload_and_hash(file, dest_path):
+    """Write an uploaded file to dest_path and return the SHA256 of its contents.
+
+    Hashes the chunks as they are written, so the saved file is not read back
+    just to compute the hash.
+    """
+    sha256_hash = hashlib.sha256()
+    with open(dest_path, 'wb') as out:
+        for chunk in iter(lambda: file.stream.read(1024 * 1024), b""):
+            out.write(chunk)
+            sha256_hash.update(chunk)
+        if hasattr(os, 'posix_fadvise'):
+            # The web process is done with the file; don't keep a batch of large
+            # uploads pinned in the page cache (process_memes re-reads on demand)
+            out.flush()
+            os.posix_fadvise(out.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return sha256_hash.hexdigest()
+
+# Duplicate check and insert in one statement: the new row becomes an 'error' pointing
+# at the first meme with the same hash (uses idx_file_hash), otherwise it is 'new'.
+# The nested replace/rtrim takes the basename of the duplicate's path.
+INSERT_UPLOADED_MEME_SQL = """
+    INSERT INTO memes (file_path, media_type, status, file_hash, error_message)
+    SELECT ?, ?,
+           CASE WHEN dup.id IS NULL THEN 'new' ELSE 'error' END,
+           ?,
+           CASE WHEN dup.id IS NULL THEN NULL
+                ELSE 'Duplicate of meme ' || dup.id || ' ('
+                     || replace(dup.file_path, rtrim(dup.file_path, replace(dup.file_path, '/', '')), '')
+                     || ')'
+           END
+    FROM (SELECT 1)
+    LEFT JOIN (SELECT id, file_path FROM memes WHERE file_hash = ? LIMIT 1) AS dup ON 1
+    RETURNING id, status
+"""
 
 def get_unique_filename(directory, filename):
     """Get a unique filename by appending numbers if file exists"""
@@ -3107,6 +3100,166 @@ def determine_media_type(filename):
         return 'image'
     return None
 
+# Processing children are watched for a failed exit by one shared thread, rather
+# than a thread per child blocked in wait(). Each child is polled until it exits,
+# however long it runs (AI calls can take minutes).
+PROCESS_WATCH_INTERVAL = 0.5  # seconds
+_watched_processes = []  # (proc, failure) with failure as passed to watch_process
+_watched_processes_lock = threading.Lock()
+_process_watcher = None
+
+def watch_process(proc, db_path, log_file, kind, meme_id, reason):
+    """Mark meme_id as failed if proc exits non-zero, however long it runs"""
+    global _process_watcher
+    failure = (db_path, log_file, kind, meme_id, reason)
+    with _watched_processes_lock:
+        _watched_processes.append((proc, failure))
+        if _process_watcher is None:
+            _process_watcher = threading.Thread(target=_watch_processes, daemon=True)
+            _process_watcher.start()
+
+def _watch_processes():
+    """Poll the watched processes until none are left, then exit"""
+    global _process_watcher
+    while True:
+        time.sleep(PROCESS_WATCH_INTERVAL)
+        failed = []
+        with _watched_processes_lock:
+            still_watched = []
+            for proc, failure in _watched_processes:
+                exit_code = proc.poll()
+                if exit_code is None:
+                    still_watched.append((proc, failure))
+                elif exit_code != 0:
+                    failed.append(failure + (exit_code,))
+            _watched_processes[:] = still_watched
+            if not still_watched:
+                _process_watcher = None
+        
+        if failed:
+            _mark_processing_failed(failed)
+        
+        if not still_watched:
+            return
+
+def mark_memes_failed(conn, errors):
+    """Set every (meme_id, error_message) in errors to error, in one transaction"""
+    if not errors:
+        return
+    # One fixed statement for any batch size, so it stays in the statement cache
+    with conn:
+        conn.executemany(
+            "UPDATE memes SET status='error', error_message=?, updated_at=CURRENT_TIMESTAMP WHERE id=?",
+            [(error_message, meme_id) for meme_id, error_message in errors]
+        )
+
+def _mark_processing_failed(failed):
+    """Set memes/albums to error after their processing runs exited non-zero.
+
+    failed is a list of (db_path, log_file, kind, meme_id, reason, exit_code);
+    each database gets one transaction for all of its failures.
+    """
+    by_db = {}
+    for failure in failed:
+        by_db.setdefault(failure[0], []).append(failure)
+    
+    for db_path, failures in by_db.items():
+        log_lines = {}
+        try:
+            conn = _open_db_connection(db_path)
+            try:
+                mark_memes_failed(conn, [
+                    (meme_id, f"{reason} with exit code {exit_code}")
+                    for _, _, _, meme_id, reason, exit_code in failures
+                ])
+            finally:
+                conn.close()
+            for _, log_file, kind, meme_id, _, exit_code in failures:
+                log_lines.setdefault(log_file, []).append(
+                    f"Updated {kind} {meme_id} status to error (exit code: {exit_code})\n"
+                )
+        except Exception as monitor_error:
+            for _, log_file, kind, meme_id, _, _ in failures:
+                log_lines.setdefault(log_file, []).append(
+                    f"Error monitoring process for {kind} {meme_id}: {monitor_error}\n"
+                )
+        
+        for log_file, lines in log_lines.items():
+            try:
+                with open(log_file, 'a', encoding='utf-8') as lf:
+                    lf.writelines(lines)
+            except Exception:
+                pass
+
+def _kick_off_processing(items):
+    """Launch process_memes.py for freshly uploaded memes/albums.
+
+    Runs on the launcher pool after the upload has been committed.
+    items is a list of (kind, id) pairs where kind is 'meme' or 'album'.
+    """
+    with app.app_context():
+        # Launch settings are the same for every item in the batch
+        instance_dir = get_script_dir()  # Instance directory
+        venv_dir = get_venv_dir()
+
+        # Resolve process_memes.py location using helper scripts dir when provided
+        script_dir = app.config.get('HELPER_SCRIPTS_DIR', instance_dir)
+        process_script = os.path.join(script_dir, 'process_memes.py')
+
+        # Working directory should be where the process script is located
+        working_dir = script_dir
+
+        # Set up environment variables for the processing script
+        env = os.environ.copy()
+        env['SCRIPT_DIR'] = instance_dir  # Instance directory (for files, logs, etc.)
+        env['LOG_DIR'] = get_log_dir()
+        db_path = get_db_path()
+        env['DB_PATH'] = db_path
+        env['MEMES_DIR'] = get_memes_dir()
+        env['MEMES_URL_BASE'] = get_memes_url_base()  # Critical for Replicate API image URLs
+        env['VENV_DIR'] = venv_dir
+
+        python_exec = os.path.join(venv_dir, "bin", "python") if os.path.exists(os.path.join(venv_dir, "bin", "python")) else "python3"
+
+        # Only the timestamp line of each log header varies per item
+        header_tail = f"Process script: {process_script}\nWorking dir: {working_dir}\n".encode() + SCAN_LOG_SEPARATOR_LINE
+
+        start_errors = []  # (meme_id, error_message) for items whose process failed to launch
+        for kind, meme_id in items:
+            try:
+                log_file = get_scan_log_file()
+                
+                with open(log_file, 'ab') as lf:
+                    lf.write(
+                        SCAN_LOG_SEPARATOR_LINE
+                        + f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Processing uploaded {kind} (id={meme_id})\n".encode()
+                        + header_tail
+                    )
+                    lf.flush()  # Header must land before the child's output
+                    
+                    # Start processing in background with error monitoring
+                    proc = subprocess.Popen(
+                        [python_exec, process_script, '--process-one', str(meme_id)],
+                        cwd=working_dir,
+                        env=env,
+                        stdout=lf,
+                        stderr=lf,
+                        start_new_session=True
+                    )
+                    
+                    # Mark the item as failed if the process exits with an error
+                    watch_process(proc, db_path, log_file, kind, meme_id, "Processing failed")
+                    
+            except Exception as e:
+                print(f"Warning: Could not trigger processing for {kind} {meme_id}: {e}")
+                # If we can't even start processing, mark as error (all at once, below)
+                start_errors.append((meme_id, f"Failed to start processing: {str(e)}"))
+        
+        try:
+            mark_memes_failed(get_db_connection(), start_errors)
+        except Exception as db_error:
+            print(f"Could not update status of {len(start_errors)} items: {db_error}")
+
 @app.route('/api/upload', methods=['POST'])
 @login_required
 def upload_files():
@@ -3131,30 +3284,28 @@ def upload_files():
         disk_quota_mb = get_disk_quota_mb()
         try:
             instance_path = Path(get_instance_path())
+            upload_size = request.content_length or 0
             
             if disk_quota_mb is not None:
-                # Use configured quota
-                total_size = 0
-                for item in instance_path.rglob('*'):
-                    if item.is_file():
-                        try:
-                            total_size += item.stat().st_size
-                        except (OSError, PermissionError):
-                            pass
+                # Use configured quota. A small upload that leaves plenty of room by
+                # the last known usage can't tip the quota, so it skips the recount.
+                total_size = peek_cached_directory_size(instance_path)
+                if (total_size is None
+                        or upload_size > QUOTA_FAST_PATH_MAX_UPLOAD_BYTES
+                        or total_size + upload_size > QUOTA_FAST_PATH_MAX_FRACTION * disk_quota_mb * 1024 * 1024):
+                    total_size = get_cached_directory_size(instance_path)
                 
                 current_usage_mb = total_size / (1024 * 1024)
                 remaining_mb = disk_quota_mb - current_usage_mb
                 quota_type = "quota"
             else:
                 # No quota configured - use filesystem free space
-                import shutil
                 stat = shutil.disk_usage(instance_path)
                 remaining_mb = stat.free / (1024 * 1024)
                 current_usage_mb = 0  # Not applicable for filesystem check
                 quota_type = "filesystem"
             
             # Calculate upload size
-            upload_size = request.content_length or 0
             upload_size_mb = upload_size / (1024 * 1024)
             
             # Check if upload would exceed available space
@@ -3231,6 +3382,7 @@ def upload_files():
         conn = get_db_connection()
         cursor = conn.cursor()
         meme_ids = []
+        to_process = []  # (kind, id) pairs handed to process_memes.py after commit
         
         if mode == 'album':
             # Create album directory with timestamp
@@ -3238,9 +3390,13 @@ def upload_files():
             album_name = f"album_{timestamp}"
             album_dir = get_albums_dir() / album_name
             album_dir.mkdir(parents=True, exist_ok=True)
+            # Canonicalize once; item paths below are plain joins onto it
+            album_dir = album_dir.resolve()
             
-            # Save all files to album directory
+            # Save all files to album directory, hashing them as they are written
+            # (before the INSERT below, so the database write lock isn't held meanwhile)
             album_item_paths = []
+            album_item_hashes = []
             for file in files:
                 if not file.filename:
                     continue
@@ -3249,254 +3405,109 @@ def upload_files():
                 unique_filename = get_unique_filename(album_dir, filename)
                 file_path = album_dir / unique_filename
                 
-                file.save(str(file_path))
-                album_item_paths.append(str(file_path.resolve()))
+                album_item_hashes.append(save_upload_and_hash(file, str(file_path)))
+                album_item_paths.append(str(file_path))
             
             if not album_item_paths:
-                conn.close()
                 return jsonify({'success': False, 'error': 'No valid files uploaded'}), 400
             
-            # Create album entry in database
-            cursor.execute(
-                "INSERT INTO memes (file_path, title, media_type, status) VALUES (?, ?, 'album', 'new')",
-                (str(album_dir.resolve()), album_name)
-            )
-            album_id = cursor.lastrowid
-            
-            # Add album items
-            for order, item_path in enumerate(album_item_paths, start=1):
-                file_hash = get_file_hash(item_path)
-                cursor.execute(
+            # Album row and its items go in as one transaction
+            with conn:
+                album_id = cursor.execute(
+                    "INSERT INTO memes (file_path, title, media_type, status) VALUES (?, ?, 'album', 'new') RETURNING id",
+                    (str(album_dir), album_name)
+                ).fetchone()[0]
+                
+                cursor.executemany(
                     "INSERT INTO album_items (album_id, file_path, display_order, file_hash) VALUES (?, ?, ?, ?)",
-                    (album_id, item_path, order, file_hash)
+                    [
+                        (album_id, item_path, order, item_hash)
+                        for order, (item_path, item_hash) in enumerate(zip(album_item_paths, album_item_hashes), start=1)
+                    ]
                 )
             
-            conn.commit()
             meme_ids.append(album_id)
-
-            # Trigger processing for the album (single-instance first, multi-tenant aware via HELPER_SCRIPTS_DIR)
-            try:
-                instance_dir = get_script_dir()  # Instance directory
-                venv_dir = get_venv_dir()
-
-                # Resolve process_memes.py location using helper scripts dir when provided
-                script_dir = app.config.get('HELPER_SCRIPTS_DIR', instance_dir)
-                process_script = os.path.join(script_dir, 'process_memes.py')
-
-                log_file = os.path.join(get_log_dir(), 'scan.log')
-                os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-                # Environment for processing script
-                env = os.environ.copy()
-                env['SCRIPT_DIR'] = instance_dir  # Instance directory (for files, logs, etc.)
-                env['LOG_DIR'] = get_log_dir()
-                env['DB_PATH'] = get_db_path()
-                env['MEMES_DIR'] = get_memes_dir()
-                env['MEMES_URL_BASE'] = get_memes_url_base()  # Critical for Replicate API image URLs
-                env['VENV_DIR'] = venv_dir
-
-                working_dir = script_dir
-
-                with open(log_file, 'a', encoding='utf-8') as lf:
-                    lf.write("================================\n")
-                    lf.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Processing uploaded album (id={album_id})\n")
-                    lf.write(f"Process script: {process_script}\n")
-                    lf.write(f"Working dir: {working_dir}\n")
-                    lf.write("================================\n")
-
-                    python_exec = os.path.join(venv_dir, "bin", "python") if os.path.exists(os.path.join(venv_dir, "bin", "python")) else "python3"
-
-                    proc = subprocess.Popen(
-                        [python_exec, process_script, '--process-one', str(album_id)],
-                        cwd=working_dir,
-                        env=env,
-                        stdout=lf,
-                        stderr=lf,
-                        start_new_session=True
-                    )
-
-                    # Best-effort background monitor to flip album to error if the process fails fast
-                    def monitor_processing():
-                        import subprocess as _subprocess
-                        try:
-                            exit_code = proc.wait(timeout=60)
-                            if exit_code != 0:
-                                conn_mon = get_db_connection()
-                                cur_mon = conn_mon.cursor()
-                                cur_mon.execute(
-                                    "UPDATE memes SET status='error', error_message=?, updated_at=CURRENT_TIMESTAMP WHERE id=?",
-                                    (f"Processing failed with exit code {exit_code}", album_id)
-                                )
-                                conn_mon.commit()
-                                conn_mon.close()
-                                lf.write(f"Updated album {album_id} status to error (exit code: {exit_code})\n")
-                        except _subprocess.TimeoutExpired:
-                            # Normal for long-running jobs
-                            pass
-                        except Exception as monitor_error:
-                            lf.write(f"Error monitoring process for album {album_id}: {monitor_error}\n")
-
-                    import threading as _threading
-                    monitor_thread = _threading.Thread(target=monitor_processing, daemon=True)
-                    monitor_thread.start()
-
-            except Exception as e:
-                print(f"Warning: Could not trigger processing for album {album_id}: {e}")
+            to_process.append(('album', album_id))
         
         else:  # single mode
-            # Save each file individually
+            # Canonicalize the upload directory once; secure_filename() output
+            # has no separators, so joined paths need no further resolving
+            files_dir = get_files_dir().resolve()
+
+            # Save and hash every file first, so the database write lock below
+            # is only held for the inserts, not for the disk writes
+            saved_files = []
             for file in files:
                 if not file.filename:
                     continue
                 
                 filename = secure_filename(file.filename)
-                unique_filename = get_unique_filename(get_files_dir(), filename)
-                file_path = get_files_dir() / unique_filename
+                unique_filename = get_unique_filename(files_dir, filename)
+                file_path = str(files_dir / unique_filename)
                 
-                file.save(str(file_path))
+                # Save, computing the file hash for duplicate detection on the way
+                file_hash = save_upload_and_hash(file, file_path)
                 
                 # Determine media type
                 media_type = determine_media_type(unique_filename)
                 if not media_type:
                     continue
-                
-                # Compute file hash for duplicate detection
-                file_hash = get_file_hash(str(file_path.resolve()))
-                
-                # Check for duplicates
-                duplicate_id = None
-                if file_hash:
-                    cursor.execute(
-                        "SELECT id, file_path FROM memes WHERE file_hash = ? LIMIT 1",
-                        (file_hash,)
-                    )
-                    duplicate = cursor.fetchone()
-                    if duplicate:
-                        duplicate_id = duplicate[0]
-                        duplicate_path = Path(duplicate[1]).name if duplicate[1] else "unknown"
-                        
-                        # Add as error with duplicate note
-                        cursor.execute(
-                            "INSERT INTO memes (file_path, media_type, status, file_hash, error_message) VALUES (?, ?, 'error', ?, ?)",
-                            (str(file_path.resolve()), media_type, file_hash, f"Duplicate of meme {duplicate_id} ({duplicate_path})")
-                        )
-                        meme_id = cursor.lastrowid
+                saved_files.append((file_path, unique_filename, media_type, file_hash))
+
+            # file_hash -> (meme_id, filename) of files added earlier in this upload
+            batch_hashes = {}
+
+            # All rows in one transaction: a single commit for the whole batch
+            with conn:
+                for file_path, unique_filename, media_type, file_hash in saved_files:
+                    # Same file twice in one upload: no need to ask the database
+                    if file_hash in batch_hashes:
+                        original_id, original_name = batch_hashes[file_hash]
+                        meme_id = cursor.execute(
+                            "INSERT INTO memes (file_path, media_type, status, file_hash, error_message) VALUES (?, ?, 'error', ?, ?) RETURNING id",
+                            (file_path, media_type, file_hash, f"Duplicate of meme {original_id} ({original_name})")
+                        ).fetchone()[0]
                         meme_ids.append(meme_id)
                         continue
-                
-                # Add to database with status='new'
-                cursor.execute(
-                    "INSERT INTO memes (file_path, media_type, status, file_hash) VALUES (?, ?, 'new', ?)",
-                    (str(file_path.resolve()), media_type, file_hash)
-                )
-                meme_id = cursor.lastrowid
-                meme_ids.append(meme_id)
-                
-                # Trigger processing for this meme
-                try:
-                    instance_dir = get_script_dir()  # Instance directory
-                    venv_dir = get_venv_dir()
-                    
-                    # Resolve process_memes.py location using helper scripts dir when provided
-                    script_dir = app.config.get('HELPER_SCRIPTS_DIR', instance_dir)
-                    process_script = os.path.join(script_dir, 'process_memes.py')
-                    
-                    log_file = os.path.join(get_log_dir(), 'scan.log')
-                    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-                    
-                    # Set up environment variables for the processing script
-                    env = os.environ.copy()
-                    env['SCRIPT_DIR'] = instance_dir  # Instance directory (for files, logs, etc.)
-                    env['LOG_DIR'] = get_log_dir()
-                    env['DB_PATH'] = get_db_path()
-                    env['MEMES_DIR'] = get_memes_dir()
-                    env['MEMES_URL_BASE'] = get_memes_url_base()  # Critical for Replicate API image URLs
-                    env['VENV_DIR'] = venv_dir
-                    
-                    # Working directory should be where the process script is located
-                    working_dir = script_dir
-                    
-                    with open(log_file, 'a', encoding='utf-8') as lf:
-                        lf.write("================================\n")
-                        lf.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Processing uploaded meme (id={meme_id})\n")
-                        lf.write(f"Process script: {process_script}\n")
-                        lf.write(f"Working dir: {working_dir}\n")
-                        lf.write("================================\n")
-                        
-                        python_exec = os.path.join(venv_dir, "bin", "python") if os.path.exists(os.path.join(venv_dir, "bin", "python")) else "python3"
-                        
-                        # Start processing in background with error monitoring
-                        proc = subprocess.Popen(
-                            [python_exec, process_script, '--process-one', str(meme_id)],
-                            cwd=working_dir,
-                            env=env,
-                            stdout=lf,
-                            stderr=lf,
-                            start_new_session=True
-                        )
-                        
-                        # Start a background thread to monitor the process and update status on failure
-                        def monitor_processing():
-                            import threading
-                            import time
-                            try:
-                                # Wait for process to complete (max 60 seconds)
-                                exit_code = proc.wait(timeout=60)
-                                if exit_code != 0:
-                                    # Processing failed, update meme status to error
-                                    conn = get_db_connection()
-                                    cursor = conn.cursor()
-                                    cursor.execute(
-                                        "UPDATE memes SET status='error', error_message=?, updated_at=CURRENT_TIMESTAMP WHERE id=?",
-                                        (f"Processing failed with exit code {exit_code}", meme_id)
-                                    )
-                                    conn.commit()
-                                    conn.close()
-                                    
-                                    # Re-open log file for writing error
-                                    with open(log_file, 'a', encoding='utf-8') as thread_lf:
-                                        thread_lf.write(f"Updated meme {meme_id} status to error (exit code: {exit_code})\n")
-                            except subprocess.TimeoutExpired:
-                                # Process is still running after 60 seconds, that's normal for processing
-                                pass
-                            except Exception as monitor_error:
-                                try:
-                                    with open(log_file, 'a', encoding='utf-8') as thread_lf:
-                                        thread_lf.write(f"Error monitoring process for meme {meme_id}: {monitor_error}\n")
-                                except:
-                                    pass
-                        
-                        # Start monitoring in a separate thread
-                        import threading
-                        monitor_thread = threading.Thread(target=monitor_processing, daemon=True)
-                        monitor_thread.start()
-                        
-                except Exception as e:
-                    print(f"Warning: Could not trigger processing for meme {meme_id}: {e}")
-                    # If we can't even start processing, mark as error immediately
-                    try:
-                        conn = get_db_connection()
-                        cursor = conn.cursor()
-                        cursor.execute(
-                            "UPDATE memes SET status='error', error_message=?, updated_at=CURRENT_TIMESTAMP WHERE id=?",
-                            (f"Failed to start processing: {str(e)}", meme_id)
-                        )
-                        conn.commit()
-                        conn.close()
-                    except Exception as db_error:
-                        print(f"Could not update meme {meme_id} status: {db_error}")
-        
-        conn.commit()
-        conn.close()
-        
+
+                    # Insert as 'new', or as 'error' with a duplicate note if the hash is known
+                    cursor.execute(INSERT_UPLOADED_MEME_SQL, (file_path, media_type, file_hash, file_hash))
+                    meme_id, status = cursor.fetchone()
+                    meme_ids.append(meme_id)
+                    if status == 'new':
+                        to_process.append(('meme', meme_id))
+                        if file_hash:
+                            batch_hashes[file_hash] = (meme_id, unique_filename)
+        
+        # The request size slightly overstates the saved files (multipart framing),
+        # which errs on the safe side for the quota until the next recount
+        adjust_cached_directory_size(request.content_length or 0)
+
+        # Start processing only now that the rows are committed, and from the
+        # launcher pool so the client gets its meme IDs without waiting on fork/exec
+        if to_process:
+            _launcher.submit(_kick_off_processing, to_process)
+        
+        # 202 Accepted while processing is still pending; clients poll /api/memes/<id>
         return jsonify({
             'success': True,
             'meme_ids': meme_ids,
             'count': len(meme_ids)
-        })
+        }), 202 if to_process else 200
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(host=get_host(), port=get_port(), debug=False)
+    # Serve with waitress when available: a real multi-threaded WSGI server, so one
+    # slow upload (hashing, DB writes) doesn't hold up other requests. A single
+    # process is deliberate - the hourly scheduler above must only run once.
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+
+    if serve is not None:
+        serve(app, host=get_host(), port=get_port(), threads=8)
+    else:
+        app.run(host=get_host(), port=get_port(), debug=False, threaded=True)
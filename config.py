@@ -86,6 +86,10 @@ def get_memes_url_base():
     """Get base URL for serving meme files"""
     return get_config_value('MEMES_URL_BASE', f'{get_base_url()}/files/')
 
+def get_files_accel_redirect():
+    """Get internal nginx location for X-Accel-Redirect file serving (None = serve from Flask)"""
+    return get_config_value('FILES_ACCEL_REDIRECT')
+
 def get_host():
     """Get host to bind Flask server to"""
     return get_config_value('HOST', '127.0.0.1')
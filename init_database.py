@@ -69,6 +69,88 @@ def get_version_from_changelog():
     
     return None
 
+# Columns covered by the memes_fts full-text index (the search box matches any of them)
+SEARCH_COLUMNS = ('file_path', 'title', 'ref_content', 'template', 'caption', 'description', 'meaning')
+
+def ensure_search_index(cursor):
+    """Create the memes_fts full-text index and the triggers keeping it in sync with memes.
+
+    memes_fts is an FTS5 external-content table: it stores only the index and reads
+    column values from memes. It is backfilled from existing rows when first created.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memes_fts'")
+    is_new = cursor.fetchone() is None
+
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{col}' for col in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{col}' for col in SEARCH_COLUMNS)
+
+    # unicode61 folds case for all of Unicode; remove_diacritics lets "cafe" find "café"
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS memes_fts USING fts5(
+            {columns},
+            content='memes', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS memes_fts_ai AFTER INSERT ON memes BEGIN
+            INSERT INTO memes_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS memes_fts_ad AFTER DELETE ON memes BEGIN
+            INSERT INTO memes_fts(memes_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    # Only text edits touch the index; status/updated_at churn from processing does not
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS memes_fts_au AFTER UPDATE OF {columns} ON memes BEGIN
+            INSERT INTO memes_fts(memes_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO memes_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    """)
+
+    if is_new:
+        cursor.execute("INSERT INTO memes_fts(memes_fts) VALUES ('rebuild')")
+
+def ensure_browse_indexes(cursor):
+    """Create the indexes used by the gallery and detail-page navigation.
+
+    Every listing is ordered by created_at and optionally filtered by status,
+    media type or tag, so these let SQLite walk an index instead of sorting.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_memes_created ON memes(created_at DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_memes_status_created ON memes(status, created_at DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_memes_media_created ON memes(media_type, created_at DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_meme_tags_tag_meme ON meme_tags(tag_id, meme_id)")
+    # meme_tags(meme_id, tag_id) is already covered by the table's UNIQUE constraint
+
+    # Gather planner statistics so SQLite can pick between these indexes. An empty
+    # memes table leaves no stats behind, so this repeats until there is data.
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+    has_stats = cursor.fetchone() is not None
+    if has_stats:
+        cursor.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = 'memes' LIMIT 1")
+        has_stats = cursor.fetchone() is not None
+    if not has_stats:
+        cursor.execute("ANALYZE")
+
+def ensure_job_table(cursor):
+    """Create the table background tag-scan jobs report their status in.
+
+    The web app adds a row when it starts a job and process_memes.py marks it
+    completed, so status polls are a primary-key lookup.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            applied INTEGER,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
 def init_database():
     """Create the database and tables if they don't exist"""
     db_path = get_db_path()  # Get path fresh each time for multi-tenant support
@@ -110,6 +192,14 @@ def init_database():
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_media_type ON memes(media_type)
     """)
+    # Duplicate detection looks memes up by content hash. Not UNIQUE on purpose:
+    # duplicates are kept as 'error' rows that share the original's hash.
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_file_hash ON memes(file_hash)
+    """)
+
+    # Full-text search index over the text columns
+    ensure_search_index(cursor)
 
     # Albums: items table
     cursor.execute("""
@@ -159,6 +249,12 @@ def init_database():
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_meme_tags_tag ON meme_tags(tag_id)
     """)
+
+    # Composite indexes for filtered, date-ordered listings
+    ensure_browse_indexes(cursor)
+
+    # Background job status
+    ensure_job_table(cursor)
     
     # Settings table
     cursor.execute("""
@@ -235,6 +331,7 @@ def init_database():
     print(f"✅ Database initialized at: {Path(db_path).resolve()}")
     print(f"📊 Tables ensured:")
     print("   - memes: id, file_path, file_size, status, media_type, title, ref_content, file_hash, template, caption, description, meaning, error_message, created_at, updated_at")
+    print(f"   - memes_fts: full-text index over {', '.join(SEARCH_COLUMNS)}")
     print("   - album_items: id, album_id, file_path, display_order, file_size, file_hash")
     print("   - tags: id, name, description, color, parse_from_filename, ai_can_suggest, created_at")
     print("   - meme_tags: meme_id, tag_id")
@@ -87,7 +87,10 @@ def _normalize_for_db(value):
 def get_db_connection():
     """Get database connection with dynamic path for multi-tenant support"""
     db_path = get_db_path()  # Get path fresh each time
-    return sqlite3.connect(db_path, timeout=10)
+    conn = sqlite3.connect(db_path, timeout=10)
+    # The web app switches the database to WAL, where NORMAL is crash-safe
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
 
 def get_replicate_api_key():
     """Get Replicate API key from database settings"""
@@ -245,17 +248,12 @@ def apply_tags_to_meme(meme_id, tag_ids):
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    applied_count = 0
-    for tag_id in tag_ids:
-        try:
-            cursor.execute("""
-                INSERT INTO meme_tags (meme_id, tag_id)
-                VALUES (?, ?)
-            """, (meme_id, tag_id))
-            applied_count += 1
-        except sqlite3.IntegrityError:
-            # Tag already exists for this meme, skip
-            pass
+    # Tags the meme already has are skipped by OR IGNORE, so rowcount is the new ones
+    cursor.executemany("""
+        INSERT OR IGNORE INTO meme_tags (meme_id, tag_id)
+        VALUES (?, ?)
+    """, [(meme_id, tag_id) for tag_id in tag_ids])
+    applied_count = max(cursor.rowcount, 0)
     
     conn.commit()
     conn.close()
@@ -359,6 +357,20 @@ def ai_suggest_and_apply_tags_from_text(meme_id: int):
         print(f"  ✗ AI tags-from-text failed: {e}")
         return [], []
 
+def _complete_tag_scan_job(job_id, applied):
+    """Mark a UI-started tag scan job as completed so the web app's poll sees it."""
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO scan_jobs (job_id, status, applied, updated_at) VALUES (?, 'completed', ?, CURRENT_TIMESTAMP)",
+            (job_id, 1 if applied else 0)
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"  ⚠️ Could not record job {job_id} status: {e}")
+    finally:
+        conn.close()
+
 def scan_tags_for_memes(meme_ids=None, run_path_parse=True, run_ai_text=True, job_id=None):
     """Scan and apply tags for given memes using path parsing and AI-from-text.
 
@@ -374,6 +386,8 @@ def scan_tags_for_memes(meme_ids=None, run_path_parse=True, run_ai_text=True, jo
     
     if tag_count == 0:
         print("ℹ️ No tags in database; cannot proceed with tag scanning")
+        if job_id:
+            _complete_tag_scan_job(job_id, False)
         return
 
     conn = get_db_connection()
@@ -389,6 +403,8 @@ def scan_tags_for_memes(meme_ids=None, run_path_parse=True, run_ai_text=True, jo
 
     if not rows:
         print("✨ No memes to tag-scan")
+        if job_id:
+            _complete_tag_scan_job(job_id, False)
         return
 
     print(f"📋 Tag scan: {len(rows)} meme(s) | path_parse={run_path_parse} ai_text={run_ai_text}")
@@ -416,6 +432,7 @@ def scan_tags_for_memes(meme_ids=None, run_path_parse=True, run_ai_text=True, jo
             total_applied += len(ai_applied)
         # If this was triggered for a single meme and job_id is provided, emit a completion marker
         if single and job_id:
+            _complete_tag_scan_job(job_id, applied_any)
             print(f"TAGSCAN JOB {job_id} COMPLETE id={meme_id} applied={'true' if applied_any else 'false'}")
     print(f"\n✅ Tag scan complete. Total tags applied: {total_applied}")
 
@@ -432,6 +449,8 @@ def _ensure_schema_migrations():
         if 'file_hash' not in cols:
             cursor.execute("ALTER TABLE memes ADD COLUMN file_hash TEXT")
             conn.commit()
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_hash ON memes(file_hash)")
+        conn.commit()
     except Exception:
         # Non-fatal; continue without blocking scan
         pass
@@ -447,12 +466,17 @@ def _get_file_size(path_str: str):
 def _get_file_hash(path_str: str):
     """Compute SHA256 hash of file contents."""
     try:
-        sha256_hash = hashlib.sha256()
         with open(path_str, "rb") as f:
-            # Read in chunks to handle large files
-            for byte_block in iter(lambda: f.read(4096), b""):
+            if hasattr(os, 'posix_fadvise'):
+                # Whole-file streaming read: let the kernel read ahead aggressively
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            # hashlib.file_digest (3.11+) runs the read/update loop in C
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            sha256_hash = hashlib.sha256()
+            for byte_block in iter(lambda: f.read(1024 * 1024), b""):
                 sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            return sha256_hash.hexdigest()
     except Exception:
         return None
 
@@ -901,20 +925,15 @@ def scan_albums(cursor, albums_path, image_extensions):
         )
         album_id = cursor.lastrowid
         
-        # Register each file in album_items table
+        # Register each file in album_items table (file_hash is NULL if it couldn't be read)
+        album_item_rows = []
         for order, album_file in enumerate(album_files, start=1):
             file_path = str(album_file.resolve())
-            file_hash = _get_file_hash(file_path)
-            if file_hash is not None:
-                cursor.execute(
-                    "INSERT INTO album_items (album_id, file_path, display_order, file_hash) VALUES (?, ?, ?, ?)",
-                    (album_id, file_path, order, file_hash)
-                )
-            else:
-                cursor.execute(
-                    "INSERT INTO album_items (album_id, file_path, display_order) VALUES (?, ?, ?)",
-                    (album_id, file_path, order)
-                )
+            album_item_rows.append((album_id, file_path, order, _get_file_hash(file_path)))
+        cursor.executemany(
+            "INSERT INTO album_items (album_id, file_path, display_order, file_hash) VALUES (?, ?, ?, ?)",
+            album_item_rows
+        )
         
         new_album_count += 1
         print(f"➕ Added: {album_title} (album with {len(album_files)} items)")
@@ -1426,6 +1445,38 @@ def process_pending_memes(include_errors=False):
     print(f"   ✅ Success: {success_count}")
     print(f"   ❌ Errors: {error_count}")
 
+def _acquire_scan_lock(lock_file):
+    """Take the scan lock shared with run_scan.sh. Returns False if another scan holds it."""
+    try:
+        with open(lock_file) as f:
+            pid = int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        pid = 0
+    if pid:
+        try:
+            os.kill(pid, 0)
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Scan already running (PID: {pid}). Skipping.")
+            return False
+        except ProcessLookupError:
+            # Stale lock file, the process is gone
+            pass
+        except PermissionError:
+            # Running, but as another user
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Scan already running (PID: {pid}). Skipping.")
+            return False
+    with open(lock_file, 'w') as f:
+        f.write(str(os.getpid()))
+    return True
+
+def _release_scan_lock(lock_file):
+    """Remove the scan lock if this process still owns it."""
+    try:
+        with open(lock_file) as f:
+            if f.read().strip() == str(os.getpid()):
+                os.remove(lock_file)
+    except OSError:
+        pass
+
 def show_stats():
     """Show database statistics"""
     conn = get_db_connection()
@@ -1495,6 +1546,11 @@ def main():
         type=str,
         help='Optional job id for tag-scan log correlation'
     )
+    parser.add_argument(
+        '--lock-file',
+        type=str,
+        help='Skip the run if another scan holds this lock file (the one run_scan.sh uses), and log start/finish lines'
+    )
     
     args = parser.parse_args()
     
@@ -1509,6 +1565,27 @@ def main():
         print(f"❌ Database not found at {db_path}. Please run init_database.py first!")
         return
     
+    # Scheduled/triggered scans from the app: same locking and log framing as run_scan.sh
+    if args.lock_file:
+        if not _acquire_scan_lock(args.lock_file):
+            return
+        print("================================")
+        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Starting scan and process")
+        print("================================", flush=True)
+        # The completion line is what the settings page waits for, so it is
+        # written (and the lock released) even if the scan fails part way
+        try:
+            _run_requested_actions(args)
+        finally:
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Scan and process completed")
+            print("", flush=True)
+            _release_scan_lock(args.lock_file)
+        return
+    
+    _run_requested_actions(args)
+
+def _run_requested_actions(args):
+    """Run the actions selected on the command line"""
     # Setup Replicate API from database (for operations that need it)
     if args.process or args.retry_errors or args.process_one or args.scan_tags_all or args.scan_tags_one or args.scan_tags_ids:
         if not setup_replicate_api():